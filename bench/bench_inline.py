@@ -0,0 +1,51 @@
+# bench_inline.py
+#
+# Measures TextNode.from_markdown throughput on multi-megabyte paragraphs.
+# Run from the project root: python3 bench/bench_inline.py [--sizes 1 2 4]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from textnode import TextNode
+
+SAMPLES = {
+    "prose": "The road goes ever on and on, down from the door where it began. ",
+    "emphasis": "Some *italic* and **bold** text with `code` in it. ",
+}
+
+
+def make_paragraph(sample, size):
+    return sample * (size // len(sample))
+
+
+def bench(text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        nodes = TextNode.from_markdown(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4], help="paragraph sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'sample':<10} {'size':>8} {'nodes':>9} {'best':>9} {'MB/s':>8}")
+    for name, sample in SAMPLES.items():
+        for size_mb in args.sizes:
+            text = make_paragraph(sample, int(size_mb * 1_000_000))
+            elapsed, count = bench(text, args.repeat)
+            mb = len(text) / 1_000_000
+            print(f"{name:<10} {mb:>6.1f}MB {count:>9} {elapsed:>8.3f}s {mb / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
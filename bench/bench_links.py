@@ -0,0 +1,50 @@
+# bench_links.py
+#
+# Measures image and link extraction on link-dense paragraphs.
+# Run from the project root: python3 bench/bench_links.py [--counts 100 1000 10000]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from textnode import TextNode, TextType
+
+
+def distinct_links(count):
+    return " ".join(
+        f"[page {i}](/pages/{i}) and ![figure {i}](/img/{i}.png)" for i in range(count)
+    )
+
+
+def repeated_links(count):
+    return " ".join("[home](/) and ![logo](/img/logo.png)" for _ in range(count))
+
+
+def bench(text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        nodes = TextNode.split_nodes_images_and_links([TextNode(text, TextType.TEXT)])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000], help="link/image pairs per paragraph")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'corpus':<10} {'pairs':>7} {'nodes':>8} {'best':>9} {'links/s':>11}")
+    for name, make in (("distinct", distinct_links), ("repeated", repeated_links)):
+        for count in args.counts:
+            elapsed, nodes = bench(make(count), args.repeat)
+            print(f"{name:<10} {count:>7} {nodes:>8} {elapsed:>8.4f}s {2 * count / elapsed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# bench_pipeline.py
+#
+# Measures every stage of the Markdown pipeline, and the whole build, on the
+# synthetic corpora in corpus.py. Results can be saved as JSON and compared
+# against an earlier run.
+# Run from the project root:
+#   python3 bench/bench_pipeline.py --out before.json
+#   python3 bench/bench_pipeline.py --baseline before.json [--corpora few_huge]
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus
+from buildlog import configure_logging
+from textnode import TextNode
+from utils import (
+    block_to_html_node,
+    generate_static_content,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    publish_static_content,
+)
+
+STAGES = ("blocks", "inline", "nodes", "to_html", "build")
+
+# A stage this much slower than the baseline is reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def inline_texts(blocks):
+    """
+    The text of every block that goes through the inline parser, without
+    heading and list markers. Code blocks are skipped.
+    """
+    texts = []
+    for block in blocks:
+        if block.startswith("```"):
+            continue
+        for line in block.split("\n"):
+            texts.append(line.lstrip("#>-*0123456789. "))
+    return texts
+
+
+def run_blocks(documents):
+    for document in documents:
+        markdown_to_blocks(document)
+
+
+def run_inline(texts):
+    for text in texts:
+        TextNode.from_markdown(text)
+
+
+def run_nodes(blocks):
+    for block in blocks:
+        block_to_html_node(block)
+
+
+def run_to_html(trees):
+    for tree in trees:
+        tree.to_html()
+
+
+def run_build(site_root):
+    """
+    Builds a site from scratch: removes what the last run generated, then
+    renders every page and publishes 'static'.
+    """
+    public = os.path.join(site_root, "public")
+    if os.path.exists(public):
+        shutil.rmtree(public)
+    cwd = os.getcwd()
+    os.chdir(site_root)
+    try:
+        generate_static_content()
+        publish_static_content(clean=True)
+    finally:
+        os.chdir(cwd)
+
+
+def make_site(documents, site_root):
+    """
+    Lays out a buildable project: the generated content, the real template and
+    the site stylesheet.
+    """
+    corpus.write_content_tree(documents, os.path.join(site_root, "content"))
+    shutil.copy(os.path.join(ROOT, "template.html"), site_root)
+    os.makedirs(os.path.join(site_root, "static"), exist_ok=True)
+    shutil.copy(os.path.join(ROOT, "static", "index.css"), os.path.join(site_root, "static"))
+
+
+def bench_corpus(name, scale, repeat):
+    documents = corpus.generate(name, scale)
+    size = sum(len(document.encode()) for document in documents)
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    texts = inline_texts(blocks)
+    trees = [markdown_to_html_node(document) for document in documents]
+
+    seconds = {
+        "blocks": best_of(repeat, run_blocks, documents),
+        "inline": best_of(repeat, run_inline, texts),
+        "nodes": best_of(repeat, run_nodes, blocks),
+        "to_html": best_of(repeat, run_to_html, trees),
+    }
+    with tempfile.TemporaryDirectory() as site_root:
+        make_site(documents, site_root)
+        seconds["build"] = best_of(repeat, run_build, site_root)
+
+    return {
+        "pages": len(documents),
+        "blocks": len(blocks),
+        "bytes": size,
+        "stages": {
+            stage: {"seconds": elapsed, "mb_per_s": size / elapsed / 1e6 if elapsed else 0.0}
+            for stage, elapsed in seconds.items()
+        },
+    }
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares two runs stage by stage.
+
+    Args:
+        results (dict): Corpus -> result, as returned by `bench_corpus`.
+        baseline (dict): The same, from an earlier run.
+        threshold (float, optional): Relative slowdown counted as a regression.
+
+    Returns:
+        tuple (list, list): Report lines, and the (corpus, stage) pairs that regressed.
+    """
+    lines = [f"{'corpus':<14} {'stage':<8} {'baseline':>10} {'now':>10} {'change':>8}"]
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for stage, timing in result["stages"].items():
+            before = baseline[name]["stages"].get(stage)
+            if before is None:
+                continue
+            change = timing["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+            flag = ""
+            if change > threshold:
+                regressions.append((name, stage))
+                flag = "  slower"
+            lines.append(
+                f"{name:<14} {stage:<8} {before['seconds']:>9.4f}s {timing['seconds']:>9.4f}s "
+                f"{100 * change:>+7.1f}%{flag}"
+            )
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Markdown pipeline on synthetic corpora.")
+    parser.add_argument("--corpora", nargs="+", choices=sorted(corpus.CORPORA), default=list(corpus.CORPORA))
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the size of every corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, the best one counts")
+    parser.add_argument("--out", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved with --out")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="relative slowdown reported as a regression (default: 0.10)",
+    )
+    args = parser.parse_args()
+
+    # Keep the build quiet; the pipeline still logs, it just goes nowhere
+    configure_logging()
+
+    results = {}
+    print(f"{'corpus':<14} {'pages':>6} {'MB':>7} " + " ".join(f"{stage:>9}" for stage in STAGES))
+    for name in args.corpora:
+        result = bench_corpus(name, args.scale, args.repeat)
+        results[name] = result
+        timings = " ".join(f"{result['stages'][stage]['seconds']:>8.4f}s" for stage in STAGES)
+        print(f"{name:<14} {result['pages']:>6} {result['bytes'] / 1e6:>7.2f} {timings}")
+
+    if args.out:
+        report = {
+            "meta": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scale": args.scale,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("scale") != args.scale:
+            print(f"Warning: baseline was run with --scale {baseline['meta'].get('scale')}")
+        lines, regressions = compare(results, baseline["results"], args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print(f"{len(regressions)} stage(s) regressed by more than {100 * args.threshold:.0f}%.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench_tree.py
+#
+# Measures rendering of synthetic HTMLNode trees that Markdown can't produce
+# yet: very wide, very deep, and both. Complements the Markdown corpora of
+# bench_pipeline.py.
+# Run from the project root:
+#   python3 bench/bench_tree.py [--repeat 5]
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_pipeline import best_of
+from htmlnode import LeafNode, ParentNode
+
+
+def wide(width=200000):
+    """A paragraph of `width` spans."""
+    return ParentNode(
+        [LeafNode(f"word {i} ", tag="b" if i % 3 else None) for i in range(width)],
+        tag="p",
+    )
+
+
+def deep(depth=20000):
+    """A chain of `depth` nested blockquotes."""
+    node = LeafNode("Deep")
+    for _ in range(depth):
+        node = ParentNode([node], tag="blockquote")
+    return node
+
+
+def bushy(fanout=6, depth=7):
+    """A complete tree of nested lists, `fanout` items per list."""
+    if depth == 0:
+        return LeafNode("item", tag="a", props={"href": "/page"})
+    return ParentNode([bushy(fanout, depth - 1) for _ in range(fanout)], tag="ul")
+
+
+TREES = {"wide": wide, "deep": deep, "bushy": bushy}
+
+
+def render_to_html(tree):
+    tree.to_html()
+
+
+def render_iter_html(tree):
+    for _ in tree.iter_html():
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark rendering of synthetic HTMLNode trees.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the best counts (default: 5)")
+    args = parser.parse_args(argv)
+
+    print(f"{'tree':<10}{'to_html':>10}{'iter_html':>11}")
+    for name, build in TREES.items():
+        tree = build()
+        try:
+            to_html = f"{best_of(args.repeat, render_to_html, tree):.4f}s"
+        except RecursionError:
+            to_html = "recursion"
+        try:
+            iter_html = f"{best_of(args.repeat, render_iter_html, tree):.4f}s"
+        except RecursionError:
+            iter_html = "recursion"
+        print(f"{name:<10}{to_html:>10}{iter_html:>11}")
+
+
+if __name__ == "__main__":
+    main()
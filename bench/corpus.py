@@ -0,0 +1,123 @@
+# corpus.py
+#
+# Synthetic Markdown corpora for the benchmarks. Every generator is seeded, so a
+# corpus is identical between runs and results can be compared.
+
+import os
+import random
+
+WORDS = (
+    "goblin cave shire hobbit ring road mountain river elf dwarf wizard tower "
+    "forest gold dragon journey map lantern bridge feast song"
+).split()
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def emphasized(rng, depth):
+    """
+    A sentence with `depth` layers of bold, italic and code spans.
+    """
+    text = sentence(rng, 6)
+    for _ in range(depth):
+        word = rng.choice(WORDS)
+        text = f"{text} **{word}** and *{rng.choice(WORDS)}* with `{word}()`"
+    return text
+
+
+def linked(rng, links):
+    parts = []
+    for i in range(links):
+        word = rng.choice(WORDS)
+        if i % 4 == 0:
+            parts.append(f"![{word}](/images/{word}-{i}.png)")
+        else:
+            parts.append(f"see [{word}](/{word}/{i})")
+    return " ".join(parts)
+
+
+def page(rng, title, paragraphs=4, lists=1, list_items=5, links=2, depth=1, code=1):
+    blocks = [f"# {title}"]
+    for i in range(paragraphs):
+        blocks.append(f"## Section {i + 1}")
+        blocks.append(" ".join([sentence(rng), emphasized(rng, depth), linked(rng, links)]))
+    for i in range(lists):
+        marker = "-" if i % 2 == 0 else None
+        items = [
+            f"{marker} {emphasized(rng, 1)}" if marker else f"{n + 1}. {sentence(rng, 8)}"
+            for n in range(list_items)
+        ]
+        blocks.append("\n".join(items))
+    for _ in range(code):
+        blocks.append("```python\nfor goblin in cave:\n    print(goblin)\n```")
+    blocks.append("> " + sentence(rng))
+    return "\n\n".join(blocks) + "\n"
+
+
+def many_small(rng, scale):
+    return [page(rng, f"Small page {i}") for i in range(int(200 * scale))]
+
+
+def few_huge(rng, scale):
+    return [page(rng, f"Huge page {i}", paragraphs=int(1500 * scale)) for i in range(3)]
+
+
+def link_heavy(rng, scale):
+    return [page(rng, f"Links {i}", paragraphs=40, links=60) for i in range(int(20 * scale))]
+
+
+def list_heavy(rng, scale):
+    return [
+        page(rng, f"Lists {i}", paragraphs=2, lists=30, list_items=40)
+        for i in range(int(20 * scale))
+    ]
+
+
+def deep_emphasis(rng, scale):
+    return [page(rng, f"Emphasis {i}", paragraphs=40, depth=25) for i in range(int(20 * scale))]
+
+
+CORPORA = {
+    "many_small": many_small,
+    "few_huge": few_huge,
+    "link_heavy": link_heavy,
+    "list_heavy": list_heavy,
+    "deep_emphasis": deep_emphasis,
+}
+
+
+def generate(name, scale=1.0, seed=0):
+    """
+    Generates the documents of a corpus.
+
+    Args:
+        name (str): A key of CORPORA.
+        scale (float, optional): Multiplies the corpus size.
+        seed (int, optional): Random seed.
+
+    Returns:
+        list: Markdown documents, each starting with an h1.
+    """
+    return CORPORA[name](random.Random(seed), scale)
+
+
+def write_content_tree(documents, content_root):
+    """
+    Lays documents out the way the generator expects: the first one as
+    'content/index.md', the rest one per subdirectory.
+
+    Args:
+        documents (list): Markdown documents.
+        content_root (str): The 'content' directory to create.
+    """
+    os.makedirs(content_root, exist_ok=True)
+    for i, document in enumerate(documents):
+        if i == 0:
+            path = os.path.join(content_root, "index.md")
+        else:
+            os.makedirs(os.path.join(content_root, f"page{i}"), exist_ok=True)
+            path = os.path.join(content_root, f"page{i}", f"page{i}.md")
+        with open(path, "w") as f:
+            f.write(document)
@@ -0,0 +1,175 @@
+# blocks.py
+
+from buildlog import TRACE, logger
+from profiler import timed
+
+HEADING = "heading"
+CODE = "code"
+QUOTE = "quote"
+UNORDERED_LIST = "unordered_list"
+ORDERED_LIST = "ordered_list"
+PARAGRAPH = "paragraph"
+
+FENCE = "```"
+_UNORDERED_MARKERS = ("* ", "- ", "+")
+
+
+class Block:
+    """
+    A block of a Markdown document, classified as it was scanned.
+
+    Attributes:
+        type (str): One of HEADING, CODE, QUOTE, UNORDERED_LIST, ORDERED_LIST or PARAGRAPH.
+        text (str): The block's Markdown. Lines are stripped, except inside code blocks.
+        start (int): The block's first line in the document, from 1.
+        end (int): The block's last line in the document.
+    """
+
+    __slots__ = ("type", "text", "start", "end")
+
+    def __init__(self, type, text, start, end):
+        self.type = type
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return NotImplemented
+        return (self.type, self.text, self.start, self.end) == (
+            other.type,
+            other.text,
+            other.start,
+            other.end,
+        )
+
+    def __repr__(self):
+        return f"Block({self.type}, {self.text!r}, {self.start}, {self.end})"
+
+
+def scan_lines(lines):
+    """
+    Splits Markdown into typed blocks, reading it one line at a time.
+
+    Blocks are separated by empty lines, except inside a fenced code block, which
+    runs from its opening fence to the closing one (or the end of the document)
+    and keeps its lines as they are. Every other line is stripped. A block's type
+    is worked out while its lines are read, so no block is split or scanned again
+    afterwards.
+
+    Args:
+        lines (iterable): Lines of Markdown, with or without their newlines, eg. an open file.
+
+    Yields:
+        Block: Every block, in document order.
+    """
+    # Checked once per document so tracing costs nothing per block when it's off
+    trace = logger.isEnabledFor(TRACE)
+    block_lines = []
+    start = None  # First line of the current block, None between blocks
+    pending = 0  # Whitespace-only lines that only count if more text follows
+    in_fence = False
+    quote = unordered = ordered = True
+    number = 0
+
+    def make_block(block_type, end):
+        text = "\n".join(block_lines)
+        if trace:
+            logger.log(TRACE, f"---DEBUG--- \n\tBlock: {text}", extra={"block": block_type, "line": start})
+        return Block(block_type, text, start, max(end, start))
+
+    def block_type():
+        if not block_lines:
+            return PARAGRAPH
+        if block_lines[0].startswith("#"):
+            return HEADING
+        if quote:
+            return QUOTE
+        if unordered:
+            return UNORDERED_LIST
+        if ordered:
+            return ORDERED_LIST
+        return PARAGRAPH
+
+    for line in lines:
+        number += 1
+        if line.endswith("\n"):
+            line = line[:-1]
+
+        if in_fence:
+            stripped = line.strip()
+            if stripped.endswith(FENCE):
+                block_lines.append(stripped)
+                yield make_block(CODE, number)
+                block_lines = []
+                start = None
+                in_fence = False
+            else:
+                block_lines.append(line)
+            continue
+
+        if not line:
+            if start is not None:
+                yield make_block(block_type(), number - 1 - pending)
+                block_lines = []
+                start = None
+                pending = 0
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            # Blank between blocks, kept only inside one
+            if block_lines:
+                pending += 1
+            continue
+
+        if not block_lines:
+            start = number
+            block_lines.append(stripped)
+            if stripped.startswith(FENCE):
+                if len(stripped) >= 2 * len(FENCE) and stripped.endswith(FENCE):
+                    yield make_block(CODE, number)
+                    block_lines = []
+                    start = None
+                else:
+                    in_fence = True
+                continue
+            quote = stripped.startswith(">")
+            unordered = stripped.startswith(_UNORDERED_MARKERS)
+            ordered = stripped.startswith("1. ")
+            continue
+
+        if pending:
+            block_lines.extend([""] * pending)
+            pending = 0
+            quote = unordered = ordered = False
+        if ordered:
+            ordered = stripped.startswith(f"{len(block_lines) + 1}. ")
+        if quote:
+            quote = stripped.startswith(">")
+        if unordered:
+            unordered = stripped.startswith(_UNORDERED_MARKERS)
+        block_lines.append(stripped)
+
+    if in_fence:
+        yield make_block(CODE, number)
+    elif start is not None:
+        yield make_block(block_type(), number - pending)
+
+
+@timed("blocks")
+def scan_blocks(markdown: str):
+    """
+    Splits a Markdown string into typed blocks.
+
+    Args:
+        markdown (str): The Markdown to split.
+
+    Returns:
+        list: Block objects, in document order.
+
+    Examples:
+        >>> scan_blocks("# Title\\n\\n- one\\n- two")
+        [Block(heading, '# Title', 1, 1), Block(unordered_list, '- one\\n- two', 3, 4)]
+    """
+    return list(scan_lines(markdown.split("\n")))
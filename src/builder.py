@@ -0,0 +1,293 @@
+# builder.py
+
+import io
+import os
+
+from buildlog import logger
+from content import index_content
+from copier import copy_file
+from htmlcache import CACHE_DIR, BodyCache
+from manifest import MANIFEST_PATH, BuildManifest
+from utils import (
+    BuildError,
+    publish_static_content,
+    remove_stale_pages,
+    render_pages,
+    write_html_document,
+)
+
+
+def public_path(static_path, static_root="static", public_root="public"):
+    """
+    Args:
+        static_path (str): A file in `static_root`.
+        static_root (str, optional): The directory that is published.
+        public_root (str, optional): The directory it's published to.
+
+    Returns:
+        str: Where the file is published.
+    """
+    return os.path.join(public_root, os.path.relpath(static_path, static_root))
+
+
+class Site:
+    """
+    A site that can be built over and over from one process, eg. a dev server
+    or a CMS preview, without paying for a cold start every time.
+
+    Every path is resolved against `root`, so nothing depends on the working
+    directory, and nothing is printed: progress goes to the build log.
+
+    Between calls the site keeps the build manifest (loaded once, saved after
+    every build), the body cache and the content index. Templates and inline
+    spans are cached per process (see `template.load_template` and
+    `utils.inline_to_html_nodes`), so they stay warm as long as the site does.
+
+        site = Site("/srv/blog", jobs=4)
+        site.build()                                  # whatever changed since the last build
+        site.build(["/srv/blog/content/about.md"])    # just what that edit affects
+        html = site.render_page("content/about.md")   # one page, in memory
+
+    Attributes:
+        root (str): The project directory.
+        content_root (str): The Markdown pages.
+        static_root (str): Static files and rendered pages, published to `public_root`.
+        public_root (str): The published site.
+        template_path (str): The page template.
+        manifest (BuildManifest): The build manifest.
+        cache (BodyCache): Rendered page bodies. None when caching is disabled.
+        jobs (int): Number of worker processes to render pages with, 0 for one per CPU core.
+        link (bool): Hard link files into `public_root` instead of copying them.
+        values (dict): Extra template placeholders, see `utils.write_html_document`.
+        pages (dict): Source path -> Page, from the last content index. None until the content is indexed.
+        problems (list): (source path, message) pairs found by the last content index.
+    """
+
+    def __init__(
+        self,
+        root=".",
+        content="content",
+        static="static",
+        public="public",
+        template="template.html",
+        manifest=MANIFEST_PATH,
+        cache=CACHE_DIR,
+        jobs=1,
+        link=False,
+        values=None,
+    ):
+        """
+        Args:
+            root (str, optional): The project directory. Every other path is relative to it, unless absolute.
+            content (str, optional): The Markdown pages.
+            static (str, optional): Static files, pages are rendered into it.
+            public (str, optional): The directory the site is published to.
+            template (str, optional): The page template.
+            manifest (str, optional): The build manifest file.
+            cache (str, optional): The body cache directory. None disables the cache.
+            jobs (int, optional): Number of worker processes to render pages with, 0 for one per CPU core.
+            link (bool, optional): Hard link files into `public` instead of copying them.
+            values (dict, optional): Strings for the template's own `{{ Name }}` placeholders. Pages aren't out of date when only these change, so build with `full=True` after changing them.
+        """
+        self.root = root
+        self.content_root = self._path(content)
+        self.static_root = self._path(static)
+        self.public_root = self._path(public)
+        self.template_path = self._path(template)
+        self.manifest = BuildManifest.load(self._path(manifest))
+        self.cache = None if cache is None else BodyCache(self._path(cache))
+        self.jobs = jobs
+        self.link = link
+        self.values = dict(values or {})
+        self.pages = None
+        self.problems = []
+
+    def _path(self, path):
+        return os.path.normpath(os.path.join(self.root, path))
+
+    def index(self):
+        """
+        Indexes the content tree again, see `content.index_content`.
+
+        Returns:
+            dict: Source path -> Page.
+        """
+        pages, self.problems = index_content(self.content_root, self.static_root)
+        self.pages = {page.source: page for page in pages}
+        return self.pages
+
+    def page(self, path):
+        """
+        Finds a page by its Markdown file, indexing the content tree again if
+        the file is new.
+
+        Args:
+            path (str): The Markdown file, absolute or relative to `root`.
+
+        Returns:
+            Page: The page.
+
+        Raises:
+            ValueError: If the file isn't a page of the site.
+        """
+        source = self._path(path)
+        if self.pages is None or source not in self.pages:
+            self.index()
+        if source not in self.pages:
+            raise ValueError(f"'{path}' is not a page in '{self.content_root}'.")
+        return self.pages[source]
+
+    def render_page(self, path):
+        """
+        Renders one page in memory. Neither the page's html file nor the
+        manifest is written; its body is read from, or stored in, the body
+        cache like in a build, so a preview keeps the cache warm. After a
+        miss the cache is trimmed to its size limit, as after a build.
+
+        Args:
+            path (str): The Markdown file, absolute or relative to `root`.
+
+        Returns:
+            str: The page's HTML document.
+
+        Raises:
+            ValueError: If the file isn't a page of the site.
+            Exception: If the page can't be read or converted.
+        """
+        page = self.page(path)
+        stored = self.cache.stored if self.cache is not None else 0
+        out = io.StringIO()
+        write_html_document(
+            page.source,
+            out,
+            self.cache,
+            base=page.base,
+            style=page.style,
+            template_path=self.template_path,
+            values=self.values,
+        )
+        if self.cache is not None and self.cache.stored != stored:
+            evicted = self.cache.evict()
+            if evicted:
+                logger.debug(f"> Evicted {evicted} entries from the body cache.")
+        return out.getvalue()
+
+    def build(self, changed_paths=None, full=False):
+        """
+        Renders and publishes the site, then saves the manifest, also when the
+        build fails.
+
+        Without `changed_paths` every page the manifest says is out of date is
+        rendered and 'static' is synced to 'public', like `main.py` does. With
+        them only what those files affect is: the changed pages, every page that
+        depends on a changed file (eg. every page for a template edit, the pages
+        linking to an edited page) and a single copy per changed static file.
+
+        Args:
+            changed_paths (list, optional): Files that were created, changed or removed, absolute or relative to `root`.
+            full (bool, optional): Forget the manifest, render every page and publish into an emptied 'public'. `changed_paths` is ignored.
+
+        Returns:
+            list: Paths of the html files that were written.
+
+        Raises:
+            BuildError: If any page fails to render. Pages that did render are published and recorded.
+        """
+        try:
+            if full or changed_paths is None:
+                return self._build_all(full)
+            return self._build_changes([self._path(path) for path in changed_paths])
+        finally:
+            self.manifest.save()
+
+    def _build_all(self, full):
+        self.index()
+        remove_stale_pages(self.manifest, self.pages.values(), self.static_root, self.public_root)
+        if full:
+            self.manifest = BuildManifest(self.manifest.path)
+        pages = []
+        for page in self.pages.values():
+            if not self.manifest.page_changed(page.source, page.output):
+                logger.debug(f"> Skipping unchanged '{page.source}'.")
+                continue
+            pages.append(page)
+
+        written = self._render(pages)
+        publish_static_content(
+            self.manifest,
+            clean=full,
+            link=self.link,
+            static_root=self.static_root,
+            public_root=self.public_root,
+        )
+        return written
+
+    def _build_changes(self, paths):
+        if self.pages is None:
+            self.index()
+        sources = set()
+        if any(self._is_content_page(path) for path in paths):
+            # Finds added pages, and removed ones to unpublish
+            old_pages = self.pages
+            self.index()
+            sources.update(
+                source
+                for source, page in self.pages.items()
+                if source not in old_pages or old_pages[source] != page
+            )
+            # Unpublished like removed static files
+            paths = paths + remove_stale_pages(
+                self.manifest, self.pages.values(), self.static_root, self.public_root
+            )
+        for path in paths:
+            sources.update(
+                source for source in self.manifest.dependents(path) if source in self.pages
+            )
+            if path in self.pages and os.path.exists(path):
+                sources.add(path)
+
+        try:
+            written = self._render([self.pages[source] for source in sorted(sources)])
+        except BuildError as e:
+            self._publish(paths, e.written)
+            raise
+        self._publish(paths, written)
+        return written
+
+    def _render(self, pages):
+        return render_pages(
+            pages,
+            {page.output: page.source for page in self.pages.values()},
+            self.manifest,
+            jobs=self.jobs,
+            cache=self.cache,
+            problems=self.problems,
+            template_path=self.template_path,
+            static_root=self.static_root,
+            values=self.values,
+        )
+
+    def _publish(self, paths, written):
+        static_files = [path for path in paths if self._in_static(path)]
+        for path in sorted(set(written).union(p for p in static_files if os.path.exists(p))):
+            target = public_path(path, self.static_root, self.public_root)
+            if not self.manifest.asset_changed(path, target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            copy_file(path, target, link=self.link)
+            self.manifest.record_asset(path, target)
+            logger.debug(f"> Published '{path}' to '{target}'.")
+        for path in static_files:
+            if os.path.exists(path):
+                continue
+            target = public_path(path, self.static_root, self.public_root)
+            if os.path.exists(target):
+                os.remove(target)
+                logger.debug(f"> Removed '{target}'.")
+            self.manifest.assets.pop(path, None)
+
+    def _is_content_page(self, path):
+        return path.startswith(self.content_root + os.sep) and path.endswith(".md")
+
+    def _in_static(self, path):
+        return path.startswith(self.static_root + os.sep)
@@ -0,0 +1,139 @@
+# buildlog.py
+
+import contextvars
+import json
+import logging
+from contextlib import contextmanager
+
+# Below DEBUG: per-block tracing in the Markdown parser
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+logger = logging.getLogger("ssg")
+
+# Attributes every LogRecord has; anything else on a record was passed with `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line, including any fields that
+    were passed with `extra` (eg. page, output, seconds).
+    """
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=logging.INFO, log_path=None, json_path=None):
+    """
+    Sets up the build logger, replacing any handlers from a previous call.
+
+    Args:
+        level (int, optional): The lowest level to log. Use TRACE for per-block parser output.
+        log_path (str, optional): Human-readable log file, overwritten on every build.
+        json_path (str, optional): JSON-lines log file, overwritten on every build.
+
+    Returns:
+        logging.Logger: The configured logger.
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(level)
+    logger.propagate = False
+
+    if log_path:
+        handler = logging.FileHandler(log_path, "w")
+        handler.setFormatter(logging.Formatter("%(levelname)-7s %(message)s"))
+        logger.addHandler(handler)
+    if json_path:
+        handler = logging.FileHandler(json_path, "w")
+        handler.setFormatter(JsonLinesFormatter())
+        logger.addHandler(handler)
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    return logger
+
+
+# (records, level) of the capture active in the current thread or task, if any
+_capture = contextvars.ContextVar("ssg_capture", default=None)
+
+
+class _CaptureFilter(logging.Filter):
+    # Diverts the records of a capturing context into its list; records logged
+    # anywhere else pass through to the logger's handlers untouched
+    def filter(self, record):
+        capture = _capture.get()
+        if capture is None:
+            return True
+        records, level = capture
+        if record.levelno >= level:
+            records.append(_record_entry(record))
+        return False
+
+
+logger.addFilter(_CaptureFilter())
+
+
+def _record_entry(record):
+    entry = dict(record.__dict__)
+    # Resolve the message now so the record can be pickled back from a worker
+    entry["msg"] = record.getMessage()
+    entry["args"] = None
+    if record.exc_info:
+        entry["exc_text"] = logging.Formatter().formatException(record.exc_info)
+    entry["exc_info"] = None
+    return entry
+
+
+@contextmanager
+def capture_records(level):
+    """
+    Collects the build logger's records instead of emitting them, eg. in a worker
+    process, so they can be replayed in order by the main process.
+
+    Only records logged in the current context (thread or asyncio task) are
+    captured, so several builds can capture at once in one process while other
+    threads keep logging normally. The logger's handlers are never touched.
+
+    Args:
+        level (int): The level to capture at. A logger that isn't enabled for it,
+            eg. in a fresh worker process, is lowered to it; in the main process
+            pages are captured at the logger's own level.
+
+    Yields:
+        list: Picklable record dicts, filled in as records are logged.
+    """
+    if not logger.isEnabledFor(level):
+        logger.setLevel(level)
+    records = []
+    token = _capture.set((records, level))
+    try:
+        yield records
+    finally:
+        _capture.reset(token)
+
+
+def replay(records):
+    """
+    Emits records captured by `capture_records` through the build logger's handlers.
+
+    Args:
+        records (list): Record dicts.
+    """
+    for entry in records:
+        logger.handle(logging.makeLogRecord(entry))
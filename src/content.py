@@ -0,0 +1,105 @@
+# content.py
+
+import os
+
+from buildlog import logger
+
+CONTENT_DIR = "content"
+OUTPUT_DIR = "static"
+
+
+class Page:
+    """
+    A Markdown file in 'content' and where it renders to.
+
+    Attributes:
+        source (str): The Markdown file, eg. "content/guides/install.md".
+        output (str): The html file it renders to, eg. "static/guides/install/index.html".
+        base (str): The page's directory relative to the site root, for the template's <base>, eg. "guides/install/". Empty for the root page.
+        style (str): The page's stylesheet name, ie. the Markdown file's name without ".md".
+    """
+
+    __slots__ = ("source", "output", "base", "style")
+
+    def __init__(self, source, output, base, style):
+        self.source = source
+        self.output = output
+        self.base = base
+        self.style = style
+
+    def __eq__(self, other):
+        if not isinstance(other, Page):
+            return NotImplemented
+        return (self.source, self.output, self.base, self.style) == (
+            other.source,
+            other.output,
+            other.base,
+            other.style,
+        )
+
+    def __repr__(self):
+        return f"Page({self.source}, {self.output}, {self.base}, {self.style})"
+
+
+def index_content(content_root=CONTENT_DIR, output_root=OUTPUT_DIR):
+    """
+    Finds every page in the content tree, walking it once without recursion.
+
+    Every directory, at any depth, can hold any number of pages:
+    - 'index.md', and '<dir>.md' named after its directory (eg.
+      'page1/page1.md'), render to '<dir>/index.html'.
+    - Every other 'name.md' renders to '<dir>/name/index.html'.
+    So a page's URL only depends on its own path, never on its neighbours.
+    Hidden files and directories are skipped, as are files that aren't Markdown.
+
+    Args:
+        content_root (str, optional): The content directory.
+        output_root (str, optional): The directory pages render into.
+
+    Returns:
+        tuple (list, list): The pages, sorted by source, and (source, message) for every page that can't be rendered because another page renders to the same file.
+    """
+    candidates = []
+    stack = [""]
+    while stack:
+        relative_dir = stack.pop()
+        names = []
+        with os.scandir(os.path.join(content_root, relative_dir)) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    stack.append(os.path.join(relative_dir, entry.name))
+                elif entry.name.endswith(".md"):
+                    names.append(entry.name)
+                else:
+                    logger.debug(f"> Ignoring non-Markdown file in '{content_root}': {entry.path}")
+
+        dir_name = os.path.basename(relative_dir)
+        for name in names:
+            style = name[:-3]
+            if style == "index" or style == dir_name:
+                page_dir = relative_dir
+            else:
+                page_dir = os.path.join(relative_dir, style)
+            candidates.append(
+                Page(
+                    source=os.path.join(content_root, relative_dir, name),
+                    output=os.path.join(output_root, page_dir, "index.html"),
+                    base=page_dir + "/" if page_dir else "",
+                    style=style,
+                )
+            )
+
+    # Sorted, so which of two conflicting pages wins doesn't depend on listing order
+    candidates.sort(key=lambda page: page.source)
+    pages = []
+    problems = []
+    owners = {}
+    for page in candidates:
+        owner = owners.setdefault(page.output, page.source)
+        if owner != page.source:
+            problems.append((page.source, f"Renders to '{page.output}', which '{owner}' already renders to."))
+            continue
+        pages.append(page)
+    return pages, problems
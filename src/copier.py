@@ -0,0 +1,195 @@
+# copier.py
+
+import errno
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# ioctl request that clones a file's extents on copy-on-write filesystems (btrfs, xfs)
+_FICLONE = 0x40049409
+
+# Errors that mean "this copy method isn't supported here", so the next one is tried
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY, errno.EPERM, errno.EBADF}
+
+
+class CopyStats:
+    """
+    The outcome of a tree copy.
+
+    Attributes:
+        copied (list): (relative path, bytes, method) for every copied file, in walk order.
+        skipped (int): Files that were already up to date.
+        seconds (float): Wall time of the copy.
+    """
+
+    def __init__(self, copied, skipped, seconds):
+        self.copied = copied
+        self.skipped = skipped
+        self.seconds = seconds
+
+    @property
+    def bytes(self):
+        return sum(size for path, size, method in self.copied)
+
+    def summary(self):
+        """
+        Returns:
+            str: Files and bytes copied, and the throughput.
+        """
+        rate = self.bytes / self.seconds if self.seconds > 0 else 0
+        return (
+            f"Copied {len(self.copied)} files ({_human_bytes(self.bytes)}), "
+            f"skipped {self.skipped}, in {self.seconds:.3f}s ({_human_bytes(rate)}/s)."
+        )
+
+
+def walk_tree(root):
+    """
+    Walks a directory tree once, without recursion.
+
+    Args:
+        root (str): The directory to walk.
+
+    Returns:
+        tuple (list, list): Relative paths of all subdirectories (parents before children) and of all files.
+    """
+    dirs = []
+    files = []
+    stack = [""]
+    while stack:
+        relative_dir = stack.pop()
+        with os.scandir(os.path.join(root, relative_dir)) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                relative_path = os.path.join(relative_dir, entry.name)
+                if entry.is_dir():
+                    dirs.append(relative_path)
+                    stack.append(relative_path)
+                elif entry.is_file():
+                    files.append(relative_path)
+    return dirs, files
+
+
+def copy_file(source, target, link=False):
+    """
+    Copies a file, including its mtime, without ever exposing a partial copy:
+    the data goes to a temporary file next to the target, which then replaces it.
+
+    The cheapest available method is used: a hard link if `link` is set, then a
+    copy-on-write clone, then `os.copy_file_range`, then a regular copy.
+
+    Args:
+        source (str): The file to copy.
+        target (str): Where to copy it to.
+        link (bool, optional): Hard link instead of copying where possible. The published file then shares its data with the source.
+
+    Returns:
+        str: The method that was used: "link", "reflink", "copy_file_range" or "copy".
+    """
+    head, tail = os.path.split(target)
+    tmp_path = os.path.join(head, f".{tail}.tmp")
+    try:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        method = None
+        if link:
+            if os.path.exists(target) and os.path.samefile(source, target):
+                # Already linked. Replacing a file with another link to the same
+                # inode is a no-op that would leave the temporary link behind
+                return "link"
+            try:
+                os.link(source, tmp_path)
+                method = "link"
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+        if method is None:
+            method = _copy_data(source, tmp_path)
+            shutil.copystat(source, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return method
+
+
+def copy_tree(source_root, target_root, should_copy=None, jobs=None, link=False):
+    """
+    Copies a directory tree on a thread pool. The tree is walked once, all target
+    directories are created up front, then files are copied concurrently.
+
+    Args:
+        source_root (str): The directory to copy from.
+        target_root (str): The directory to copy into.
+        should_copy (callable, optional): Called with (source, target) for every file; files it returns False for are skipped. Runs on the pool.
+        jobs (int, optional): Number of copy threads. Defaults to the ThreadPoolExecutor default.
+        link (bool, optional): Passed to `copy_file`.
+
+    Returns:
+        CopyStats: What was copied and how fast.
+    """
+    start = time.perf_counter()
+    dirs, files = walk_tree(source_root)
+    os.makedirs(target_root, exist_ok=True)
+    for relative_dir in dirs:
+        os.makedirs(os.path.join(target_root, relative_dir), exist_ok=True)
+
+    def copy_one(relative_path):
+        source = os.path.join(source_root, relative_path)
+        target = os.path.join(target_root, relative_path)
+        if should_copy is not None and not should_copy(source, target):
+            return None
+        method = copy_file(source, target, link=link)
+        return relative_path, os.path.getsize(target), method
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(copy_one, files))
+
+    copied = [result for result in results if result is not None]
+    return CopyStats(copied, len(files) - len(copied), time.perf_counter() - start)
+
+
+def _copy_data(source, target):
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return "reflink"
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+                if remaining == 0:
+                    return "copy_file_range"
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+            # Start over with a plain copy
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+
+        shutil.copyfileobj(src, dst, 1 << 20)
+        return "copy"
+
+
+def _human_bytes(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
@@ -0,0 +1,60 @@
+# fixtures.py
+#
+# Shared setup for the tests that work with files.
+
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    A test case with a fresh temporary directory for every test, removed
+    afterwards with `addCleanup`.
+
+    Attributes:
+        tmp (str): The temporary directory.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def path(self, name):
+        """
+        Args:
+            name (str): A path relative to the temporary directory, or an absolute path.
+
+        Returns:
+            str: The path.
+        """
+        return os.path.join(self.tmp, name)
+
+    def write_file(self, name, text):
+        """
+        Writes a text file, creating its directories.
+
+        Args:
+            name (str): A path relative to the temporary directory, or an absolute path.
+            text (str): The file's content.
+
+        Returns:
+            str: The file's path.
+        """
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def read_file(self, name):
+        """
+        Args:
+            name (str): A path relative to the temporary directory, or an absolute path.
+
+        Returns:
+            str: The file's content.
+        """
+        with open(self.path(name), "r") as f:
+            return f.read()
@@ -0,0 +1,140 @@
+# htmlcache.py
+
+import hashlib
+import os
+
+CACHE_DIR = ".ssg-cache"
+CACHE_MAX_BYTES = 64 << 20
+
+# Part of every key: bump whenever a change to the Markdown parser (blocks.py,
+# textnode.py, htmlnode.py, markdown_to_html_node) changes the HTML it produces,
+# so bodies rendered by the old parser are never reused.
+PARSER_VERSION = 3
+
+
+class BodyCache:
+    """
+    On-disk cache of rendered page bodies, ie. `markdown_to_html_node(...).to_html()`,
+    keyed by a hash of the Markdown source and the parser version.
+
+    Pages whose Markdown didn't change (eg. when only the template did) are
+    filled into the template from the cache without being parsed. Entries are
+    content-addressed, so identical pages share one entry and a stale entry can
+    never be served. Reading an entry marks it as recently used; `evict` removes
+    the least recently used entries once the cache outgrows its size limit.
+
+    Attributes:
+        root (str): The cache directory.
+        max_bytes (int): Size the cache is trimmed to by `evict`.
+        version (int): Parser version the keys are made with.
+        stored (int): Number of entries stored through this object, eg. to evict only after a miss.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, version=PARSER_VERSION):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.version = version
+        self.stored = 0
+
+    @property
+    def max_entry_bytes(self):
+        # Larger pages are streamed without being cached, so they never have to
+        # be held in memory as one string
+        return self.max_bytes // 8
+
+    def accepts(self, size):
+        """
+        Args:
+            size (int): The size of a page's Markdown.
+
+        Returns:
+            bool: Whether the page is small enough to be cached.
+        """
+        return size <= self.max_entry_bytes
+
+    def key(self, text):
+        """
+        Hashes a page's Markdown together with the parser version.
+
+        Args:
+            text (str): The Markdown.
+
+        Returns:
+            str: The entry's key.
+        """
+        digest = hashlib.sha256(f"parser-{self.version}\n".encode())
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key + ".html")
+
+    def get(self, key):
+        """
+        Looks up a rendered body and marks it as recently used.
+
+        Args:
+            key (str): The entry's key.
+
+        Returns:
+            str: The body HTML, or None if it isn't cached.
+        """
+        path = self.path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                body = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return body
+
+    def put(self, key, body):
+        """
+        Stores a rendered body. The entry is written to a temporary file first,
+        so concurrent builds never read a partial entry.
+
+        Args:
+            key (str): The entry's key.
+            body (str): The body HTML.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        self.stored += 1
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in `max_bytes`.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        entries = []
+        total = 0
+        if not os.path.isdir(self.root):
+            return 0
+        with os.scandir(self.root) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as files:
+                    for entry in files:
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                        total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
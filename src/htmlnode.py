@@ -1,6 +1,51 @@
 # htmlnode.py
 from textnode import TextNode, TextType
 
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_ATTRIBUTE_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
+def escape_text(text):
+    """
+    Escapes text for use as HTML element content.
+
+    The whole string is translated in one `str.translate` call, and only if it
+    contains a character that needs escaping at all, which most text doesn't.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The text with "&", "<" and ">" escaped.
+    """
+    if "&" in text or "<" in text or ">" in text:
+        return text.translate(_TEXT_ESCAPES)
+    return text
+
+
+def props_to_html(props):
+    """
+    Serializes HTML attributes, escaping their values the same way as
+    `escape_text`, plus '"'.
+
+    Args:
+        props (dict): Attribute name -> value. May be None or empty.
+
+    Returns:
+        str: The attributes, each with a leading space, e.g. ' href="/page1"'.
+    """
+    if not props:
+        return ""
+    html = ""
+    for key, value in props.items():
+        if not isinstance(value, str):
+            value = str(value)
+        if '"' in value or "&" in value or "<" in value or ">" in value:
+            value = value.translate(_ATTRIBUTE_ESCAPES)
+        html += f' {key}="{value}"'
+    return html
+
+
 class HTMLNode:
     """
     Represents an HTML node in a document.
@@ -10,8 +55,19 @@ class HTMLNode:
         value (str): The text content of the node.
         children (list): A list of child HTMLNode objects.
         props (dict): A dictionary of HTML attributes and their values.
+
+    Nodes use `__slots__`, so every inline span of a page doesn't carry its own
+    `__dict__`. Subclasses must declare `__slots__` as well to keep that.
+
+    A node's props are serialized once, the first time it's rendered, and kept
+    with the node: nodes shared through the inline memo (see
+    `utils.inline_to_html_nodes`), like a navigation's links, are serialized
+    once per build instead of once per page. Don't change `props` after a node
+    was rendered.
     """
 
+    __slots__ = ("tag", "value", "children", "props", "_props_html")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         """
         Initializes an HTMLNode instance.
@@ -26,6 +82,7 @@ class HTMLNode:
         self.value = value
         self.children = children
         self.props = props
+        self._props_html = None
 
     def to_html(self):
         """
@@ -36,18 +93,36 @@ class HTMLNode:
         """
         raise NotImplementedError
 
+    def iter_html(self):
+        """
+        Serializes the node as a stream of HTML string chunks, so a large
+        document never has to exist as one string.
+
+        Yields:
+            str: Consecutive pieces of the node's HTML.
+        """
+        yield self.to_html()
+
+    def write_html(self, out):
+        """
+        Writes the node's HTML into a file-like object chunk by chunk.
+
+        Args:
+            out: Any object with a `writelines` method, e.g. an open file or `io.StringIO`.
+        """
+        out.writelines(self.iter_html())
+
     def props_to_html(self):
         """
         Converts the node's properties to an HTML string.
 
         Returns:
-            str: A string of HTML attributes.
+            str: A string of HTML attributes, see the module's `props_to_html`.
         """
-        props_string = ""
-        if self.props:
-            for key, value in self.props.items():
-                props_string = props_string + f' {key}="{value}"'
-        return props_string
+        props_html = self._props_html
+        if props_html is None:
+            props_html = self._props_html = props_to_html(self.props)
+        return props_html
 
     def __repr__(self):
         """
@@ -107,6 +182,8 @@ class LeafNode(HTMLNode):
         value (str): The text content of the node.
         props (dict): A dictionary of HTML attributes and their values.
     """
+    __slots__ = ()
+
     def __init__(self, value, tag=None, props=None):
         """
         Initializes a LeafNode instance.
@@ -116,30 +193,44 @@ class LeafNode(HTMLNode):
             tag (str, optional): The HTML tag for the node. Defaults to None.
             props (dict, optional): A dictionary of HTML attributes and their values. Defaults to None.
         """
-        super().__init__(tag, value, None, props)
+        # Assigned directly rather than through HTMLNode.__init__: one call less per inline span
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+        self._props_html = None
 
     def to_html(self):
         """
         Converts the LeafNode to an HTML string.
 
+        The value is escaped, so it's always rendered as text.
+
         Returns:
             str: The HTML string representation of the LeafNode.
 
         Raises:
             ValueError: If the LeafNode has no value.
         """
-        if self.value == None:
+        value = self.value
+        if value is None:
             raise ValueError(f"Leaf node has no value: {self}")
-        if not self.tag:
-            return self.value
+        # `escape_text`, inlined: this runs for every inline span of every page
+        if "&" in value or "<" in value or ">" in value:
+            value = value.translate(_TEXT_ESCAPES)
+        tag = self.tag
+        if not tag:
+            return value
+        # Void elements have no content and no closing tag, props or not
+        if tag == "img":
+            return f"<{tag}{self.props_to_html()}>"
+        if not self.props:
+            return f"<{tag}>{value}</{tag}>"
 
-        props_str = ""
-        if self.props:
-            for key, val in self.props.items():
-                props_str = props_str + f' {key}="{val}"'
-        if self.tag == "img":
-            return f"<{self.tag}{props_str}>"
-        return f"<{self.tag}{props_str}>{self.value}</{self.tag}>"
+        props_str = self._props_html
+        if props_str is None:
+            props_str = self._props_html = props_to_html(self.props)
+        return f"<{tag}{props_str}>{value}</{tag}>"
 
 class ParentNode(HTMLNode):
     """
@@ -150,6 +241,8 @@ class ParentNode(HTMLNode):
         children (list): A list of child nodes.
         props (dict): A dictionary of HTML attributes and their values.
     """
+    __slots__ = ()
+
     def __init__(self, children, tag=None, props=None):
         """
         Initializes a ParentNode instance.
@@ -165,23 +258,74 @@ class ParentNode(HTMLNode):
         """
         Converts the ParentNode and its children to an HTML string.
 
+        Like `iter_html`, this walks the tree with an explicit stack, so trees of
+        any depth render without recursion.
+
         Returns:
             str: The HTML string representation of the ParentNode and its children.
 
         Raises:
-            ValueError: If the ParentNode has no tag or no children.
+            ValueError: If the ParentNode, or any ParentNode below it, has no tag or no children.
+        """
+        pieces = []
+        append = pieces.append
+        append(self._open_tag())
+        stack = [(self.tag, iter(self.children))]
+        while stack:
+            tag, children = stack[-1]
+            for child in children:
+                kind = type(child)
+                if kind is LeafNode:
+                    append(child.to_html())
+                elif kind is ParentNode:
+                    append(child._open_tag())
+                    stack.append((child.tag, iter(child.children)))
+                    break
+                else:
+                    # Other node types render themselves
+                    append(child.to_html())
+            else:
+                stack.pop()
+                append(f"</{tag}>")
+        return "".join(pieces)
+
+    def iter_html(self):
         """
+        Streams the ParentNode and its children as HTML string chunks.
+
+        The tree is walked with an explicit stack of open elements instead of
+        one nested generator per level, so trees of any depth stream without
+        recursion, and each chunk is yielded once rather than passed up through
+        every level above it.
+
+        Yields:
+            str: The opening tag, every chunk of every child, then the closing tag.
+
+        Raises:
+            ValueError: If the ParentNode, or any ParentNode below it, has no tag or no children.
+        """
+        yield self._open_tag()
+        stack = [(self.tag, iter(self.children))]
+        while stack:
+            tag, children = stack[-1]
+            for child in children:
+                kind = type(child)
+                if kind is LeafNode:
+                    yield child.to_html()
+                elif kind is ParentNode:
+                    yield child._open_tag()
+                    stack.append((child.tag, iter(child.children)))
+                    break
+                else:
+                    # Other node types stream themselves
+                    yield from child.iter_html()
+            else:
+                stack.pop()
+                yield f"</{tag}>"
+
+    def _open_tag(self):
         if not self.tag:
             raise ValueError("Parent node has no tag!")
         if not self.children:
             raise ValueError("Parent node has no children!")
-
-        inner_html = ""
-        for child in self.children:
-            inner_html += child.to_html()
-
-        props_str = ""
-        if self.props:
-            for key, val in self.props.items():
-                props_str = props_str + f' {key}="{val}"'
-        return f"<{self.tag}{props_str}>{inner_html}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>"
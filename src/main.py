@@ -1,18 +1,113 @@
 import sys
 import os
-from utils import publish_static_content, generate_static_content, extract_title, markdown_to_blocks
-from contextlib import redirect_stdout
+import time
+import logging
+import argparse
+import cProfile
+import profiler
+from builder import Site
+from utils import extract_title, markdown_to_blocks, BuildError
+from manifest import MANIFEST_PATH
+from htmlcache import CACHE_DIR
+from buildlog import TRACE, configure_logging, logger
 
 DEBUG_LOG_PATH = "debug_log.txt"
 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the site from 'content' into 'public'.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help=f"ignore the build manifest ({MANIFEST_PATH}) and rebuild everything",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render pages in N worker processes (0 = one per CPU core, default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"don't reuse or store rendered page bodies in {CACHE_DIR}/",
+    )
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="hard link files from 'static' into 'public' instead of copying them",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help=f"log more to {DEBUG_LOG_PATH}: -v for every file, -vv to also trace every Markdown block",
+    )
+    parser.add_argument(
+        "--json-log",
+        metavar="PATH",
+        help="also write the build log as JSON lines, with per-page timings",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every build phase per page and print the slowest phases and pages",
+    )
+    parser.add_argument(
+        "--pstats",
+        metavar="PATH",
+        help="dump a cProfile/pstats file of the build (worker processes aren't included, use -j 1)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or more")
+    return args
+
+
+def finish_profiling(profile, stats_profiler, pstats_path):
+    if stats_profiler is not None:
+        stats_profiler.disable()
+        stats_profiler.dump_stats(pstats_path)
+        print(f"--- Wrote cProfile stats to {pstats_path}")
+    if profile is not None:
+        profiler.stop()
+        report = profile.report()
+        logger.info(report, extra={"phases": profile.phase_totals()})
+        print(report)
+
+
 if __name__ == "__main__":
+    args = parse_args()
     print("--- START: main.py")
 
-    with open(DEBUG_LOG_PATH, "w") as f:
-        with redirect_stdout(f):
-            generate_static_content()
-            publish_static_content()
+    level = (logging.INFO, logging.DEBUG, TRACE)[min(args.verbose, 2)]
+    configure_logging(level, log_path=DEBUG_LOG_PATH, json_path=args.json_log)
+    site = Site(cache=None if args.no_cache else CACHE_DIR, jobs=args.jobs, link=args.link)
+
+    profile = profiler.start() if args.profile else None
+    stats_profiler = cProfile.Profile() if args.pstats else None
+
+    start = time.perf_counter()
+    try:
+        if stats_profiler is not None:
+            stats_profiler.enable()
+        written = site.build(full=args.full)
+    except BuildError as e:
+        finish_profiling(profile, stats_profiler, args.pstats)
+        logger.error(e.report(), extra={"failed": len(e.errors)})
+        print(e.report())
+        print("--- END: main.py failed. Program execution log: " + DEBUG_LOG_PATH)
+        sys.exit(1)
+    finish_profiling(profile, stats_profiler, args.pstats)
+    logger.info(
+        f"--- Build finished: {len(written)} page(s) rendered.",
+        extra={"pages": len(written), "seconds": time.perf_counter() - start},
+    )
 
+    print(f"--- Rendered {len(written)} page(s).")
     print(
         "--- END: main.py exited successfully. Program execution log: " + DEBUG_LOG_PATH
     )
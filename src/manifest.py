@@ -0,0 +1,249 @@
+# manifest.py
+
+import hashlib
+import json
+import os
+
+MANIFEST_PATH = ".ssg-manifest.json"
+MANIFEST_VERSION = 2
+
+
+def hash_file(path):
+    """
+    Hashes the contents of a file.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        str: Hex digest of the file's SHA-256 hash.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Records what the last build produced so the next one can skip unchanged work.
+
+    Pages are keyed by their Markdown source path and remember the source's hash,
+    the output path, the source's mtime and the page's dependencies: every other
+    file its output was rendered from (the template, its stylesheet, the pages it
+    links to), with the hash each had at the time. Together they form the build's
+    dependency graph: a change to any file invalidates exactly the pages that
+    depend on it (see `page_changed` and `dependents`). A dependency that didn't
+    exist is recorded with a hash of None, so creating it invalidates its pages too.
+
+    Assets are keyed by their path in 'static' and remember the hash, output path
+    and mtime of the last published copy.
+
+    Attributes:
+        path (str): Where the manifest is stored between runs.
+        pages (dict): Source path -> page record.
+        assets (dict): Static file path -> asset record.
+        inputs (dict): Dependency path -> hash, mtime and size when it was last hashed, so unchanged dependencies aren't read again.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.pages = {}
+        self.assets = {}
+        self.inputs = {}
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        """
+        Loads a manifest from disk. A missing, unreadable or outdated manifest
+        yields an empty one, which makes the next build a full build.
+
+        Args:
+            path (str): The path to the manifest file.
+
+        Returns:
+            BuildManifest: The loaded manifest.
+        """
+        manifest = cls(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if data.get("version") != MANIFEST_VERSION:
+            return manifest
+        manifest.pages = data.get("pages", {})
+        manifest.assets = data.get("assets", {})
+        manifest.inputs = data.get("inputs", {})
+        return manifest
+
+    def save(self):
+        """
+        Writes the manifest to disk. Inputs no page depends on anymore are dropped.
+        """
+        used = set()
+        for record in self.pages.values():
+            used.update(record["dependencies"])
+        self.inputs = {path: record for path, record in self.inputs.items() if path in used}
+        data = {
+            "version": MANIFEST_VERSION,
+            "pages": self.pages,
+            "assets": self.assets,
+            "inputs": self.inputs,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def page_changed(self, source, output):
+        """
+        Checks whether a page has to be rendered again.
+
+        Args:
+            source (str): The path to the Markdown file.
+            output (str): The path of the HTML file the page renders to.
+
+        Returns:
+            bool: True if the page is new, its source or any of its dependencies changed, or its output is missing.
+        """
+        record = self.pages.get(source)
+        if record is None:
+            return True
+        if record["output"] != output:
+            return True
+        if not os.path.exists(output):
+            return True
+        if _file_changed(record, source):
+            return True
+        return any(
+            self.input_hash(path) != content_hash
+            for path, content_hash in record["dependencies"].items()
+        )
+
+    def record_page(self, source, output, dependencies=()):
+        """
+        Remembers a page after it was rendered.
+
+        Args:
+            source (str): The path to the Markdown file.
+            output (str): The path of the HTML file the page was written to.
+            dependencies (iterable, optional): Paths of the other files the page was rendered from. They don't have to exist.
+        """
+        record = _file_record(source, output)
+        record["dependencies"] = {path: self.input_hash(path) for path in dependencies}
+        self.pages[source] = record
+
+    def prune_pages(self, pages):
+        """
+        Forgets the pages that are no longer on the site.
+
+        Args:
+            pages (iterable): The site's current Page objects, see `content.index_content`.
+
+        Returns:
+            list: Sorted output paths no current page renders to anymore: those of removed pages, and the old outputs of pages that moved.
+        """
+        current = {page.source: page.output for page in pages}
+        outputs = set(current.values())
+        stale = []
+        for source, record in list(self.pages.items()):
+            if current.get(source) == record["output"]:
+                continue
+            if source not in current:
+                del self.pages[source]
+            if record["output"] not in outputs:
+                stale.append(record["output"])
+        return sorted(stale)
+
+    def dependents(self, path):
+        """
+        Finds the pages that have to be rendered again when a file changes.
+
+        Args:
+            path (str): The changed, created or removed file.
+
+        Returns:
+            list: Sorted source paths of the pages that depend on the file.
+        """
+        return sorted(
+            source for source, record in self.pages.items() if path in record["dependencies"]
+        )
+
+    def input_hash(self, path):
+        """
+        Hashes a dependency, trusting the last hash if its mtime and size match.
+
+        Args:
+            path (str): The path to the file.
+
+        Returns:
+            str: Hex digest of the file's hash, or None if it doesn't exist.
+        """
+        if not os.path.isfile(path):
+            self.inputs.pop(path, None)
+            return None
+        stat = os.stat(path)
+        record = self.inputs.get(path)
+        if record is None or record["mtime"] != stat.st_mtime_ns or record["size"] != stat.st_size:
+            record = {"content_hash": hash_file(path), "mtime": stat.st_mtime_ns, "size": stat.st_size}
+            self.inputs[path] = record
+        return record["content_hash"]
+
+    def asset_changed(self, source, output):
+        """
+        Checks whether a static file has to be published again.
+
+        Args:
+            source (str): The path to the file in 'static'.
+            output (str): The path of its copy in 'public'.
+
+        Returns:
+            bool: True if the file is new, changed, or its published copy is missing.
+        """
+        record = self.assets.get(source)
+        if record is None or record["output"] != output:
+            return True
+        if not os.path.exists(output):
+            return True
+        return _file_changed(record, source)
+
+    def record_asset(self, source, output):
+        """
+        Remembers a static file after it was published.
+
+        Args:
+            source (str): The path to the file in 'static'.
+            output (str): The path of its copy in 'public'.
+        """
+        self.assets[source] = _file_record(source, output)
+
+
+def _file_record(source, output):
+    stat = os.stat(source)
+    return {
+        "content_hash": hash_file(source),
+        "output": output,
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def _file_changed(record, source):
+    """
+    Compares a file against its record. Matching mtime and size are trusted
+    without reading the file; otherwise the contents are hashed, so a file that
+    was only touched is not treated as changed.
+    """
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return True
+    if stat.st_mtime_ns == record["mtime"] and stat.st_size == record["size"]:
+        return False
+    if hash_file(source) != record["content_hash"]:
+        return True
+    record["mtime"] = stat.st_mtime_ns
+    record["size"] = stat.st_size
+    return False
@@ -0,0 +1,86 @@
+# output.py
+
+import hashlib
+import os
+
+from manifest import hash_file
+
+
+class OutputFile:
+    """
+    A text file that is written atomically and only replaced if its contents change.
+
+    Everything is written to a temporary file next to the target and hashed on
+    the way. On a clean exit the new contents are compared to the existing
+    file: identical output is dropped, so the file keeps its mtime (and rsync,
+    CDN and browser caches keep their copies); otherwise the temporary file
+    replaces the target with `os.replace`, so a reader never sees a partial
+    file. If the block raises, the temporary file is removed and the target is
+    left alone.
+
+    Text is written as UTF-8 without newline translation, so the bytes on disk
+    are exactly what was hashed.
+
+    Usage:
+        with OutputFile(path) as out:
+            out.write(html)
+        out.changed  # False if the file already had this content
+
+    Attributes:
+        path (str): The file to write.
+        changed (bool): After the block: whether the file was created or replaced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        head, tail = os.path.split(path)
+        self.tmp_path = os.path.join(head, f".{tail}.tmp")
+        self.changed = None
+        self._file = None
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def __enter__(self):
+        self._file = open(self.tmp_path, "w", encoding="utf-8", newline="")
+        return self
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self._digest.update(data)
+        self._size += len(data)
+        self._file.write(text)
+
+    def writelines(self, lines):
+        for text in lines:
+            self.write(text)
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._file.close()
+        if exc_type is not None:
+            _remove(self.tmp_path)
+            return False
+        try:
+            self.changed = not self._matches(self.path)
+            if self.changed:
+                os.replace(self.tmp_path, self.path)
+            else:
+                os.remove(self.tmp_path)
+        except BaseException:
+            _remove(self.tmp_path)
+            raise
+        return False
+
+    def _matches(self, path):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        # Only files of the same size have to be read and hashed
+        return size == self._size and hash_file(path) == self._digest.hexdigest()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
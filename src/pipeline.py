@@ -0,0 +1,138 @@
+# pipeline.py
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Items each stage may hold before the one feeding it has to wait
+DEFAULT_DEPTH = 16
+DEFAULT_IO_WORKERS = 4
+
+_DONE = object()
+
+
+def run_stages(items, read, render, write, jobs=1, io_workers=DEFAULT_IO_WORKERS, depth=DEFAULT_DEPTH):
+    """
+    Runs items through read -> render -> write stages that overlap, so rendering
+    never waits on the disk.
+
+    - A discover thread feeds the items to an I/O thread pool that runs `read`,
+      through a bounded queue, so reads run ahead of rendering by at most
+      `depth` items.
+    - `render` runs in this thread (jobs=1), or on a process pool with a bounded
+      number of items in flight.
+    - `write` runs on the I/O thread pool, again with at most `depth` writes
+      outstanding.
+
+    `read` and `write` run on threads, so they must not touch process-wide
+    state such as logging handlers or the build profile.
+
+    Args:
+        items (iterable): The work items, eg. pages.
+        read (callable): read(item) -> data. Runs on an I/O thread.
+        render (callable): render(item, data) -> rendered. Must be picklable when jobs != 1.
+        write (callable): write(item, rendered) -> written. Runs on an I/O thread.
+        jobs (int, optional): Render processes; 1 renders in this process.
+        io_workers (int, optional): Threads for reading and writing.
+        depth (int, optional): Bound of every queue between stages.
+
+    Yields:
+        tuple: (item, rendered, written, error) for every item, in the order of `items`. `error` is the exception raised by any stage for the item, in which case the later stages were skipped for it.
+    """
+    io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="ssg-io")
+    render_pool = ProcessPoolExecutor(max_workers=jobs) if jobs != 1 else None
+    read_queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def discover():
+        try:
+            for item in items:
+                entry = (item, io_pool.submit(read, item))
+                # Wait for room in the queue, unless the consumer went away
+                while not stop.is_set():
+                    try:
+                        read_queue.put(entry, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if stop.is_set():
+                    return
+        finally:
+            while not stop.is_set():
+                try:
+                    read_queue.put(_DONE, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    discoverer = threading.Thread(target=discover, name="ssg-discover", daemon=True)
+    discoverer.start()
+
+    rendering = deque()  # (item, future of the render)
+    writing = deque()  # (item, rendered, future of the write)
+
+    def start_render(item, data, error):
+        if error is not None:
+            future = Future()
+            future.set_exception(error)
+        elif render_pool is not None:
+            future = render_pool.submit(render, item, data)
+        else:
+            future = Future()
+            try:
+                future.set_result(render(item, data))
+            except Exception as e:
+                future.set_exception(e)
+        rendering.append((item, future))
+
+    def finish_render():
+        item, future = rendering.popleft()
+        try:
+            rendered = future.result()
+        except Exception as e:
+            failed = Future()
+            failed.set_exception(e)
+            writing.append((item, None, failed))
+            return
+        writing.append((item, rendered, io_pool.submit(write, item, rendered)))
+
+    def finish_write():
+        item, rendered, future = writing.popleft()
+        try:
+            return item, rendered, future.result(), None
+        except Exception as e:
+            return item, rendered, None, e
+
+    try:
+        while True:
+            entry = read_queue.get()
+            if entry is _DONE:
+                break
+            item, read_future = entry
+            try:
+                data, error = read_future.result(), None
+            except Exception as e:
+                data, error = None, e
+            start_render(item, data, error)
+            while len(rendering) > (depth if render_pool is not None else 0):
+                finish_render()
+            while len(writing) > depth:
+                yield finish_write()
+
+        while rendering:
+            finish_render()
+        while writing:
+            yield finish_write()
+    finally:
+        stop.set()
+        # Unblock the discover thread if it's waiting for room in the queue
+        while True:
+            try:
+                read_queue.get_nowait()
+            except queue.Empty:
+                break
+        discoverer.join()
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        if render_pool is not None:
+            render_pool.shutdown(wait=True, cancel_futures=True)
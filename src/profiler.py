@@ -0,0 +1,184 @@
+# profiler.py
+
+import functools
+import time
+from contextlib import contextmanager
+
+# Pseudo-page that build-wide phases (eg. publishing) are recorded under
+SITE = "(site)"
+
+_active = None
+
+
+class BuildProfile:
+    """
+    Per-page, per-phase build timings.
+
+    Phases are timed exclusively: time spent in a nested phase (eg. "inline"
+    inside "nodes") is only counted for the nested one, so the phases of a page
+    add up to the time spent in all of them.
+
+    Attributes:
+        pages (dict): Page -> {phase: seconds}.
+        page (str): The page phases are currently recorded for.
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.page = SITE
+        self._stack = []
+
+    def enter(self, phase):
+        self._stack.append([phase, time.perf_counter(), 0.0])
+
+    def exit(self):
+        phase, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        self.add(self.page, phase, elapsed - nested)
+
+    def add(self, page, phase, seconds):
+        phases = self.pages.setdefault(page, {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def merge(self, pages):
+        """
+        Adds timings recorded elsewhere, eg. in a worker process.
+
+        Args:
+            pages (dict): Page -> {phase: seconds}.
+        """
+        for page, phases in pages.items():
+            for phase, seconds in phases.items():
+                self.add(page, phase, seconds)
+
+    def phase_totals(self):
+        """
+        Returns:
+            dict: Phase -> seconds across all pages.
+        """
+        totals = {}
+        for phases in self.pages.values():
+            for phase, seconds in phases.items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+        return totals
+
+    def report(self, top=5):
+        """
+        Formats the phase totals and the slowest pages.
+
+        Args:
+            top (int, optional): How many pages to list.
+
+        Returns:
+            str: A multi-line report.
+        """
+        totals = self.phase_totals()
+        total = sum(totals.values()) or 1.0
+        lines = ["Phase totals (exclusive):"]
+        for phase, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+            lines.append(f"\t{phase:<12} {seconds:9.4f}s {100 * seconds / total:6.1f}%")
+
+        page_times = {
+            page: sum(phases.values()) for page, phases in self.pages.items() if page != SITE
+        }
+        slowest = sorted(page_times.items(), key=lambda item: -item[1])[:top]
+        lines.append(f"Slowest pages ({len(slowest)} of {len(page_times)}):")
+        for page, seconds in slowest:
+            phases = sorted(self.pages[page].items(), key=lambda item: -item[1])
+            breakdown = ", ".join(f"{phase} {time:.4f}s" for phase, time in phases[:3])
+            lines.append(f"\t{page:<40} {seconds:9.4f}s  ({breakdown})")
+        return "\n".join(lines)
+
+
+def start():
+    """
+    Starts recording into a new profile for this process.
+
+    Returns:
+        BuildProfile: The profile being recorded.
+    """
+    global _active
+    _active = BuildProfile()
+    return _active
+
+
+def stop():
+    """
+    Stops recording.
+
+    Returns:
+        BuildProfile: The profile that was recorded, or None.
+    """
+    global _active
+    profile, _active = _active, None
+    return profile
+
+
+def active():
+    return _active
+
+
+@contextmanager
+def recording(enabled=True):
+    """
+    Records into a fresh profile for the enclosed code, then restores whatever
+    profile was active before. Used per page, so timings from worker processes
+    and from the main process are collected the same way.
+
+    Args:
+        enabled (bool, optional): When False, nothing is recorded and None is yielded.
+
+    Yields:
+        BuildProfile: The profile being recorded, or None.
+    """
+    global _active
+    if not enabled:
+        yield None
+        return
+    saved = _active
+    _active = BuildProfile()
+    try:
+        yield _active
+    finally:
+        _active = saved
+
+
+@contextmanager
+def phase(name):
+    """
+    Times the enclosed code as a phase of the current page, if profiling.
+    """
+    profile = _active
+    if profile is None:
+        yield
+        return
+    profile.enter(name)
+    try:
+        yield
+    finally:
+        profile.exit()
+
+
+def timed(name):
+    """
+    Decorator that times every call of a function as a phase, if profiling.
+    When profiling is off it only adds one global lookup per call.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _active
+            if profile is None:
+                return func(*args, **kwargs)
+            profile.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.exit()
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,116 @@
+# template.py
+
+import os
+import re
+
+# Matches placeholders such as "{{ Title }}" or "{{Content}}"
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Path -> (mtime, size, Template), so each process parses a template once
+_template_cache = {}
+
+
+class Template:
+    """
+    A template compiled into a render plan of literal segments and named slots.
+
+    The template text is parsed once. Rendering fills every slot in a single
+    pass, so values are never scanned for placeholders themselves. Slots with
+    no value are rendered as the original placeholder text.
+
+    Attributes:
+        segments (list): Literal strings and (name, placeholder) tuples, in template order.
+        names (set): Names of all placeholders in the template.
+        repeated (set): Names of the placeholders that appear more than once.
+    """
+
+    def __init__(self, text):
+        """
+        Compiles template text.
+
+        Args:
+            text (str): The template text.
+        """
+        self.segments = []
+        self.names = set()
+        self.repeated = set()
+        last_end = 0
+        for match in _PLACEHOLDER_RE.finditer(text):
+            if match.start() > last_end:
+                self.segments.append(text[last_end : match.start()])
+            self.segments.append((match.group(1), match.group()))
+            if match.group(1) in self.names:
+                self.repeated.add(match.group(1))
+            self.names.add(match.group(1))
+            last_end = match.end()
+        if last_end < len(text):
+            self.segments.append(text[last_end:])
+
+    def render(self, values):
+        """
+        Renders the template to a string.
+
+        Args:
+            values (dict): Placeholder name -> string.
+
+        Returns:
+            str: The filled template.
+        """
+        pieces = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                pieces.append(segment)
+            else:
+                name, placeholder = segment
+                pieces.append(values.get(name, placeholder))
+        return "".join(pieces)
+
+    def write(self, out, values):
+        """
+        Renders the template into a file-like object. Values may be strings or
+        HTMLNode objects, which are streamed with `write_html`. A node whose
+        placeholder appears more than once is serialized to a string once and
+        written at every occurrence, since a streamed node, eg. a
+        `utils.StreamedDocument`, can only be serialized once.
+
+        Args:
+            out: A writable text file-like object.
+            values (dict): Placeholder name -> string or HTMLNode.
+        """
+        if self.repeated:
+            values = dict(values)
+            for name in self.repeated:
+                value = values.get(name)
+                if value is not None and not isinstance(value, str):
+                    values[name] = value.to_html()
+        for segment in self.segments:
+            if isinstance(segment, str):
+                out.write(segment)
+                continue
+            name, placeholder = segment
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                out.write(value)
+            else:
+                value.write_html(out)
+
+
+def load_template(path):
+    """
+    Returns the compiled template for a file, parsing it only when the file is
+    new or has changed since it was last loaded.
+
+    Args:
+        path (str): The path to the template file.
+
+    Returns:
+        Template: The compiled template.
+    """
+    stat = os.stat(path)
+    cached = _template_cache.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(path, "r") as f:
+        template = Template(f.read())
+    _template_cache[path] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
@@ -0,0 +1,71 @@
+# test_blocks.py
+
+import unittest
+from blocks import *
+
+
+class TestScanBlocks(unittest.TestCase):
+
+    def test_types(self):
+        markdown = "# Title\n\n> quote\n> more\n\n- a\n* b\n\n1. one\n2. two\n\nJust text."
+        self.assertEqual(
+            [block.type for block in scan_blocks(markdown)],
+            [HEADING, QUOTE, UNORDERED_LIST, ORDERED_LIST, PARAGRAPH],
+        )
+
+    def test_misnumbered_list_is_paragraph(self):
+        self.assertEqual(scan_blocks("1. one\n3. three")[0].type, PARAGRAPH)
+
+    def test_line_ranges(self):
+        markdown = "\n# Title\n\nLine one\nLine two\n\n\n- item\n"
+        self.assertEqual(
+            scan_blocks(markdown),
+            [
+                Block(HEADING, "# Title", 2, 2),
+                Block(PARAGRAPH, "Line one\nLine two", 4, 5),
+                Block(UNORDERED_LIST, "- item", 8, 8),
+            ],
+        )
+
+    def test_lines_are_stripped(self):
+        self.assertEqual(scan_blocks("  indented  \ntext")[0].text, "indented\ntext")
+
+    def test_whitespace_line_inside_block(self):
+        block = scan_blocks("> a\n   \n> b")[0]
+        self.assertEqual(block.text, "> a\n\n> b")
+        self.assertEqual(block.type, PARAGRAPH)
+
+    def test_whitespace_line_between_blocks(self):
+        self.assertEqual(
+            scan_blocks("# T\n\n   \n\ntext\n  "),
+            [Block(HEADING, "# T", 1, 1), Block(PARAGRAPH, "text", 5, 5)],
+        )
+        self.assertEqual(scan_blocks("  \t\n"), [])
+
+    def test_code_keeps_whitespace_and_empty_lines(self):
+        markdown = "Intro\n\n```python\ndef f():\n    return 1\n\n\nprint(f())\n```\n\nAfter"
+        blocks = scan_blocks(markdown)
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(blocks[1].type, CODE)
+        self.assertEqual(blocks[1].text, "```python\ndef f():\n    return 1\n\n\nprint(f())\n```")
+        self.assertEqual((blocks[1].start, blocks[1].end), (3, 9))
+        self.assertEqual(blocks[2], Block(PARAGRAPH, "After", 11, 11))
+
+    def test_unclosed_fence_runs_to_end(self):
+        blocks = scan_blocks("```\ncode\n\nmore")
+        self.assertEqual(blocks, [Block(CODE, "```\ncode\n\nmore", 1, 4)])
+
+    def test_scan_lines_from_file_lines(self):
+        lines = ["# Title\n", "\n", "Text\n"]
+        self.assertEqual(
+            list(scan_lines(lines)),
+            [Block(HEADING, "# Title", 1, 1), Block(PARAGRAPH, "Text", 3, 3)],
+        )
+
+    def test_empty(self):
+        self.assertEqual(scan_blocks(""), [])
+        self.assertEqual(scan_blocks("\n\n\n"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
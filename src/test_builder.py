@@ -0,0 +1,170 @@
+# test_builder.py
+
+import os
+import unittest
+
+from builder import Site, public_path
+from buildlog import logger
+from fixtures import TempDirTestCase
+from utils import BuildError
+
+TEMPLATE = "<title>{{ Title }}</title><base href=\"/{{ Base }}\">{{ Content }}"
+
+
+class TestSite(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_file("template.html", TEMPLATE)
+        self.write_file("static/index.css", "body {}")
+        self.write_file("content/index.md", "# Home\n\nSee [the guide](/guide/install/).\n")
+        self.write_file("content/guide/install.md", "# Install\n\nRun it.\n")
+        self.write_file("content/guide/usage.md", "# Usage\n\nUse it.\n")
+        # No cache, so every render goes through the parser
+        self.site = Site(self.tmp, cache=None)
+
+    def test_render_page(self):
+        html = self.site.render_page("content/guide/usage.md")
+        self.assertEqual(
+            html,
+            '<title>Usage</title><base href="/guide/usage/"><div><h1>Usage</h1><p>Use it.</p></div>',
+        )
+        self.assertFalse(os.path.exists(self.path("static/guide/usage/index.html")))
+        with self.assertRaises(ValueError):
+            self.site.render_page("content/missing.md")
+
+    def test_render_page_trims_cache_after_miss(self):
+        site = Site(self.tmp)
+        site.cache.max_bytes = 400
+        stale = "0" * 64
+
+        def put_stale():
+            site.cache.put(stale, "x" * 400)
+            os.utime(site.cache.path(stale), ns=(0, 0))
+
+        put_stale()
+        site.render_page("content/guide/usage.md")
+        self.assertIsNone(site.cache.get(stale))
+        # A hit stores nothing, so the cache isn't scanned
+        put_stale()
+        site.render_page("content/guide/usage.md")
+        self.assertIsNotNone(site.cache.get(stale))
+
+    def test_custom_placeholders(self):
+        self.write_file("template.html", "<title>{{ Title }} | {{ SiteName }}</title>{{ Content }}")
+        site = Site(self.tmp, cache=None, values={"SiteName": "Middle-earth", "Title": "Ignored"})
+        self.assertTrue(site.render_page("content/index.md").startswith("<title>Home | Middle-earth</title>"))
+        site.build()
+        self.assertIn("<title>Usage | Middle-earth</title>", self.read_file("public/guide/usage/index.html"))
+
+    def test_render_page_finds_new_pages(self):
+        self.site.index()
+        self.write_file("content/news.md", "# News\n")
+        self.assertIn("<title>News</title>", self.site.render_page(self.path("content/news.md")))
+
+    def test_build(self):
+        written = self.site.build()
+        self.assertEqual(
+            sorted(written),
+            [
+                self.path("static/guide/install/index.html"),
+                self.path("static/guide/usage/index.html"),
+                self.path("static/index.html"),
+            ],
+        )
+        self.assertEqual(self.read_file("public/index.css"), "body {}")
+        self.assertIn("<title>Home</title>", self.read_file("public/index.html"))
+        self.assertTrue(os.path.exists(self.path(".ssg-manifest.json")))
+        # Nothing changed, nothing is rendered
+        self.assertEqual(self.site.build(), [])
+        self.assertEqual(Site(self.tmp, cache=None).build(), [])
+
+    def test_build_changes_renders_dependents(self):
+        self.site.build()
+        self.write_file("content/guide/install.md", "# Installation\n\nRun it now.\n")
+        # The home page links to 'install.md'
+        written = self.site.build([self.path("content/guide/install.md")])
+        self.assertEqual(
+            sorted(written),
+            [self.path("static/guide/install/index.html"), self.path("static/index.html")],
+        )
+        self.assertIn("<title>Installation</title>", self.read_file("public/guide/install/index.html"))
+
+    def test_build_changes_template(self):
+        self.site.build()
+        self.write_file("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        written = self.site.build(["template.html"])
+        self.assertEqual(len(written), 3)
+        self.assertTrue(self.read_file("public/guide/usage/index.html").startswith("<h1>Usage</h1>"))
+
+    def test_build_changes_static_files(self):
+        self.site.build()
+        self.write_file("static/images/a.png", "png")
+        self.assertEqual(self.site.build(["static/images/a.png"]), [])
+        self.assertEqual(self.read_file("public/images/a.png"), "png")
+
+        # The home page's stylesheet
+        self.write_file("static/index.css", "body { color: red; }")
+        self.assertEqual(self.site.build(["static/index.css"]), [self.path("static/index.html")])
+        self.assertEqual(self.read_file("public/index.css"), "body { color: red; }")
+
+        os.remove(self.path("static/images/a.png"))
+        self.site.build(["static/images/a.png"])
+        self.assertFalse(os.path.exists(self.path("public/images/a.png")))
+
+    def test_build_changes_added_page_keeps_neighbours(self):
+        self.write_file("content/blog/first.md", "# First\n")
+        self.site.build()
+        # A second page doesn't move 'first.md', so only the new page renders
+        self.write_file("content/blog/second.md", "# Second\n")
+        written = self.site.build(["content/blog/second.md"])
+        self.assertEqual(written, [self.path("static/blog/second/index.html")])
+        self.assertIn("<title>First</title>", self.read_file("public/blog/first/index.html"))
+        self.assertIn("<title>Second</title>", self.read_file("public/blog/second/index.html"))
+
+    def test_removed_page_is_unpublished(self):
+        self.write_file("content/news/2024/launch.md", "# Launch\n")
+        self.site.build()
+        self.assertTrue(os.path.exists(self.path("public/news/2024/launch/index.html")))
+        os.remove(self.path("content/news/2024/launch.md"))
+        self.site.build(["content/news/2024/launch.md"])
+        # The directories it leaves empty go too, 'static' and 'public' stay
+        for root in ("static", "public"):
+            self.assertFalse(os.path.exists(self.path(f"{root}/news")))
+            self.assertTrue(os.path.exists(self.path(f"{root}/index.html")))
+        self.assertNotIn(self.path("content/news/2024/launch.md"), self.site.manifest.pages)
+
+    def test_full_build_removes_deleted_pages(self):
+        self.site.build()
+        os.remove(self.path("content/guide/usage.md"))
+        self.assertEqual(self.site.build(), [])
+        for root in ("static", "public"):
+            self.assertFalse(os.path.exists(self.path(f"{root}/guide/usage")))
+            self.assertTrue(os.path.exists(self.path(f"{root}/guide/install/index.html")))
+        self.assertEqual(
+            sorted(Site(self.tmp).manifest.pages),
+            [self.path("content/guide/install.md"), self.path("content/index.md")],
+        )
+
+    def test_invalid_page_fails_build(self):
+        self.site.build()
+        self.write_file("content/guide/usage.md", "# Usage\n\n```\nnever closed\n")
+        self.write_file("content/guide/install.md", "# Install\n\nRun it again.\n")
+        with self.assertRaises(BuildError) as raised, self.assertLogs(logger, "ERROR"):
+            self.site.build(["content/guide/usage.md", "content/guide/install.md"])
+        # Validation stops the build before anything is rendered
+        self.assertEqual(raised.exception.written, [])
+        self.assertEqual(
+            [source for source, error in raised.exception.errors],
+            [self.path("content/guide/usage.md")],
+        )
+
+    def test_public_path(self):
+        self.assertEqual(
+            public_path(os.path.join("site", "static", "a", "b.css"), os.path.join("site", "static"), "out"),
+            os.path.join("out", "a", "b.css"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
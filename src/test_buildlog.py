@@ -0,0 +1,87 @@
+# test_buildlog.py
+
+import json
+import logging
+import threading
+import unittest
+
+from buildlog import TRACE, capture_records, configure_logging, logger, replay
+from fixtures import TempDirTestCase
+from utils import markdown_to_blocks
+
+
+class TestBuildLog(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(configure_logging, logging.WARNING)
+        self.log_path = self.path("build.log")
+        self.json_path = self.path("build.jsonl")
+
+    def _json_lines(self):
+        return [json.loads(line) for line in self.read_file(self.json_path).splitlines()]
+
+    def test_json_lines_include_extra_fields(self):
+        configure_logging(logging.INFO, json_path=self.json_path)
+        logger.info("Rendered", extra={"page": "content/index.md", "seconds": 0.5})
+        logger.debug("hidden")
+        entries = self._json_lines()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["message"], "Rendered")
+        self.assertEqual(entries[0]["level"], "INFO")
+        self.assertEqual(entries[0]["page"], "content/index.md")
+        self.assertEqual(entries[0]["seconds"], 0.5)
+
+    def test_block_tracing_off_by_default(self):
+        configure_logging(logging.DEBUG, log_path=self.log_path)
+        markdown_to_blocks("Block 1\n\nBlock 2")
+        self.assertEqual(self.read_file(self.log_path), "")
+
+    def test_block_tracing(self):
+        configure_logging(TRACE, log_path=self.log_path)
+        markdown_to_blocks("Block 1\n\nBlock 2")
+        self.assertIn("Block: Block 1", self.read_file(self.log_path))
+
+    def test_capture_and_replay(self):
+        configure_logging(logging.INFO, json_path=self.json_path)
+        with capture_records(logging.INFO) as records:
+            logger.info("one %s", "arg", extra={"page": "a.md"})
+            logger.debug("dropped")
+        self.assertEqual(self._json_lines(), [])
+        self.assertEqual(len(records), 1)
+        replay(records)
+        entries = self._json_lines()
+        self.assertEqual([entry["message"] for entry in entries], ["one arg"])
+        self.assertEqual(entries[0]["page"], "a.md")
+
+    def test_concurrent_captures_keep_their_own_records(self):
+        configure_logging(logging.INFO, json_path=self.json_path)
+        handlers = list(logger.handlers)
+        all_logging = threading.Barrier(3)
+        captured = {}
+
+        def build(name):
+            with capture_records(logging.INFO) as records:
+                all_logging.wait()
+                logger.info(name)
+                all_logging.wait()
+            captured[name] = records
+
+        threads = [threading.Thread(target=build, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        # Logged outside any capture while both builds are capturing
+        all_logging.wait()
+        logger.info("service")
+        all_logging.wait()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([entry["msg"] for entry in captured["a"]], ["a"])
+        self.assertEqual([entry["msg"] for entry in captured["b"]], ["b"])
+        self.assertEqual(logger.handlers, handlers)
+        self.assertEqual([entry["message"] for entry in self._json_lines()], ["service"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# test_content.py
+
+import os
+import unittest
+from content import Page, index_content
+from fixtures import TempDirTestCase
+
+
+class TestIndexContent(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+
+    def write(self, *paths):
+        for path in paths:
+            self.write_file(os.path.join(self.content, path), "# Page\n")
+
+    def index(self):
+        pages, problems = index_content(self.content, "static")
+        return [(os.path.relpath(page.source, self.content), page.output, page.base, page.style) for page in pages], problems
+
+    def test_one_page_per_directory(self):
+        self.write("index.md", "goblin/goblin.md", "page1/page1.md")
+        pages, problems = self.index()
+        self.assertEqual(
+            pages,
+            [
+                ("goblin/goblin.md", "static/goblin/index.html", "goblin/", "goblin"),
+                ("index.md", "static/index.html", "", "index"),
+                ("page1/page1.md", "static/page1/index.html", "page1/", "page1"),
+            ],
+        )
+        self.assertEqual(problems, [])
+
+    def test_many_pages_per_directory_and_nested_sections(self):
+        self.write(
+            "index.md",
+            "guides/index.md",
+            "guides/install.md",
+            "guides/usage.md",
+            "guides/advanced/tuning.md",
+        )
+        pages, problems = self.index()
+        self.assertEqual(
+            pages,
+            [
+                ("guides/advanced/tuning.md", "static/guides/advanced/tuning/index.html", "guides/advanced/tuning/", "tuning"),
+                ("guides/index.md", "static/guides/index.html", "guides/", "index"),
+                ("guides/install.md", "static/guides/install/index.html", "guides/install/", "install"),
+                ("guides/usage.md", "static/guides/usage/index.html", "guides/usage/", "usage"),
+                ("index.md", "static/index.html", "", "index"),
+            ],
+        )
+        self.assertEqual(problems, [])
+
+    def test_urls_dont_depend_on_neighbours(self):
+        self.write("blog/first.md", "notes/notes.md")
+        before, problems = self.index()
+        self.write("blog/second.md", "notes/draft.md")
+        after, problems = self.index()
+        self.assertEqual([page for page in after if page in before], before)
+        self.assertEqual(
+            [page[1] for page in after],
+            [
+                "static/blog/first/index.html",
+                "static/blog/second/index.html",
+                "static/notes/draft/index.html",
+                "static/notes/index.html",
+            ],
+        )
+
+    def test_skips_hidden_and_non_markdown_files(self):
+        self.write("index.md", "notes.txt", ".draft.md", ".git/HEAD.md", "a/a.md", "a/image.png")
+        pages, problems = self.index()
+        self.assertEqual([page[0] for page in pages], ["a/a.md", "index.md"])
+
+    def test_conflicting_outputs_are_reported(self):
+        # 'docs/setup.md' and 'docs/setup/setup.md' both render to docs/setup/index.html,
+        # like 'docs/docs.md' and 'docs/index.md' both render to docs/index.html
+        self.write("docs/docs.md", "docs/index.md", "docs/setup.md", "docs/setup/setup.md")
+        pages, problems = self.index()
+        self.assertEqual(
+            [page[0] for page in pages], ["docs/docs.md", "docs/setup.md"]
+        )
+        self.assertEqual(
+            [os.path.relpath(source, self.content) for source, message in problems],
+            ["docs/index.md", "docs/setup/setup.md"],
+        )
+        self.assertIn("docs/docs.md", problems[0][1])
+        self.assertIn("docs/setup.md", problems[1][1])
+
+    def test_page_equality(self):
+        self.assertEqual(Page("a.md", "a.html", "", "a"), Page("a.md", "a.html", "", "a"))
+        self.assertNotEqual(Page("a.md", "a.html", "", "a"), Page("a.md", "b.html", "", "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
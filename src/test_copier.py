@@ -0,0 +1,81 @@
+# test_copier.py
+
+import os
+import unittest
+
+from copier import copy_file, copy_tree, walk_tree
+from fixtures import TempDirTestCase
+
+
+class TestCopier(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.source = self.path("static")
+        self.target = self.path("public")
+        os.makedirs(os.path.join(self.source, "images", "icons"))
+
+    def test_walk_tree(self):
+        self.write_file("static/index.html", "x")
+        self.write_file(os.path.join("static", "images", "icons", "a.png"), "x")
+        dirs, files = walk_tree(self.source)
+        self.assertEqual(dirs, ["images", os.path.join("images", "icons")])
+        self.assertEqual(files, ["index.html", os.path.join("images", "icons", "a.png")])
+
+    def test_copy_tree_many_files(self):
+        # More files than the recursion limit used to allow in one directory
+        for i in range(1500):
+            self.write_file(f"static/{i}.txt", str(i))
+        stats = copy_tree(self.source, self.target, jobs=4)
+        self.assertEqual(len(stats.copied), 1500)
+        self.assertEqual(stats.skipped, 0)
+        with open(os.path.join(self.target, "1499.txt")) as f:
+            self.assertEqual(f.read(), "1499")
+        self.assertTrue(os.path.isdir(os.path.join(self.target, "images", "icons")))
+
+    def test_copy_tree_should_copy(self):
+        self.write_file("static/a.css", "a")
+        self.write_file("static/b.css", "b")
+        stats = copy_tree(self.source, self.target, lambda source, target: source.endswith("a.css"))
+        self.assertEqual([path for path, size, method in stats.copied], ["a.css"])
+        self.assertEqual(stats.skipped, 1)
+        self.assertEqual(stats.bytes, 1)
+        self.assertIn("Copied 1 files", stats.summary())
+
+    def test_copy_file_replaces_and_keeps_mtime(self):
+        self.write_file("static/a.css", "new")
+        os.makedirs(self.target)
+        target = os.path.join(self.target, "a.css")
+        with open(target, "w") as f:
+            f.write("old")
+        copy_file(os.path.join(self.source, "a.css"), target)
+        with open(target) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(
+            os.stat(target).st_mtime_ns, os.stat(os.path.join(self.source, "a.css")).st_mtime_ns
+        )
+        self.assertEqual(os.listdir(self.target), ["a.css"])
+
+    def test_copy_file_link(self):
+        self.write_file("static/a.css", "a")
+        os.makedirs(self.target)
+        source = os.path.join(self.source, "a.css")
+        target = os.path.join(self.target, "a.css")
+        method = copy_file(source, target, link=True)
+        if method == "link":
+            self.assertTrue(os.path.samefile(source, target))
+        with open(target) as f:
+            self.assertEqual(f.read(), "a")
+
+    def test_copy_file_link_twice(self):
+        self.write_file("static/a.css", "a")
+        os.makedirs(self.target)
+        source = os.path.join(self.source, "a.css")
+        target = os.path.join(self.target, "a.css")
+        copy_file(source, target, link=True)
+        copy_file(source, target, link=True)
+        self.assertEqual(os.listdir(self.target), ["a.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# test_htmlcache.py
+
+import io
+import os
+import unittest
+from fixtures import TempDirTestCase
+from htmlcache import BodyCache
+from utils import write_html_document
+
+
+class TestBodyCache(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root = self.path("cache")
+        self.text = "# Title\n\nSome text.\n"
+        self.source = self.write_file("page.md", self.text)
+
+    def test_put_and_get(self):
+        cache = BodyCache(self.root)
+        key = cache.key(self.text)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<div><p>Some text.</p></div>")
+        self.assertEqual(cache.get(key), "<div><p>Some text.</p></div>")
+
+    def test_key_depends_on_content_and_parser_version(self):
+        key = BodyCache(self.root).key(self.text)
+        self.assertNotEqual(BodyCache(self.root, version=-1).key(self.text), key)
+        self.assertNotEqual(BodyCache(self.root).key(self.text + "More.\n"), key)
+
+    def test_accepts_small_pages(self):
+        cache = BodyCache(self.root, max_bytes=800)
+        self.assertTrue(cache.accepts(100))
+        self.assertFalse(cache.accepts(101))
+
+    def test_evicts_least_recently_used(self):
+        cache = BodyCache(self.root, max_bytes=250)
+        for i, key in enumerate(("aa1", "bb2", "cc3")):
+            cache.put(key, "x" * 100)
+            os.utime(cache.path(key), ns=(i * 10**9, i * 10**9))
+        # Reading an entry makes it the most recently used one
+        cache.get("aa1")
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get("bb2"))
+        self.assertIsNotNone(cache.get("aa1"))
+        self.assertIsNotNone(cache.get("cc3"))
+
+    def test_evict_empty(self):
+        self.assertEqual(BodyCache(self.root).evict(), 0)
+
+    def test_write_html_document_uses_cached_body(self):
+        cache = BodyCache(self.root)
+        template = self.write_file("template.html", "<title>{{ Title }}</title>{{ Content }}")
+
+        out = io.StringIO()
+        write_html_document(self.source, out, cache, template_path=template)
+        self.assertEqual(out.getvalue(), "<title>Title</title><div><h1>Title</h1><p>Some text.</p></div>")
+
+        # A hit is served as stored, without parsing the Markdown
+        cache.put(cache.key(self.text), "<div>cached</div>")
+        out = io.StringIO()
+        write_html_document(self.source, out, cache, template_path=template)
+        self.assertEqual(out.getvalue(), "<title>Title</title><div>cached</div>")
+
+        # So is Markdown that was already read
+        out = io.StringIO()
+        write_html_document(self.source, out, cache, text=self.text, template_path=template)
+        self.assertEqual(out.getvalue(), "<title>Title</title><div>cached</div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
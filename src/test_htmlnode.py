@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import *
@@ -71,6 +72,38 @@ class TestHTMLNode(unittest.TestCase):
         with self.assertRaises(TypeError):
             html_node = HTMLNode.text_node_to_html_node("Hello")
 
+    def test_props_are_escaped(self):
+        node = HTMLNode("a", props={"href": '/demo/ "title" & <more>'})
+        self.assertEqual(node.props_to_html(), ' href="/demo/ &quot;title&quot; &amp; &lt;more&gt;"')
+
+    def test_props_are_serialized_once(self):
+        node = LeafNode("Page 1", tag="a", props={"href": "/page1"})
+        self.assertEqual(node.to_html(), '<a href="/page1">Page 1</a>')
+        self.assertIs(node.props_to_html(), node.props_to_html())
+        self.assertEqual(props_to_html(None), "")
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a < b && "c" > d'), 'a &lt; b &amp;&amp; "c" &gt; d')
+        text = "nothing to escape"
+        self.assertIs(escape_text(text), text)
+
+    def test_leaf_text_is_escaped(self):
+        self.assertEqual(LeafNode("<ins>").to_html(), "&lt;ins&gt;")
+        self.assertEqual(
+            LeafNode("if a < b:", tag="code", props={"class": "py"}).to_html(),
+            '<code class="py">if a &lt; b:</code>',
+        )
+        self.assertEqual(
+            LeafNode("", tag="img", props={"src": 'x.png "t"', "alt": "A & B"}).to_html(),
+            '<img src="x.png &quot;t&quot;" alt="A &amp; B">',
+        )
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("Hello"), ParentNode([LeafNode("Hello")], tag="p")):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
 
 class TestLeafNode(unittest.TestCase):
 
@@ -86,6 +119,10 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("Hello", tag="p", props={"class": "text-red"})
         self.assertEqual(node.to_html(), "<p class=\"text-red\">Hello</p>")
 
+    def test_img_without_props_is_void(self):
+        self.assertEqual(LeafNode("", tag="img").to_html(), "<img>")
+        self.assertEqual(LeafNode("", tag="img", props={}).to_html(), "<img>")
+
     def test_to_html_no_value_raises_error(self):
         node = LeafNode(None, tag="p")
         with self.assertRaises(ValueError):
@@ -128,6 +165,47 @@ class TestParentNode(unittest.TestCase):
         div = ParentNode([span1, span2], tag="div", props={"id": "content"})
         expected_html = "<div id=\"content\"><span>One</span><span class=\"bold\">Two</span></div>"
         self.assertEqual(div.to_html(), expected_html)
+    def test_iter_html_chunks(self):
+        inner_node = ParentNode([LeafNode("Inner")], tag="span")
+        outer_node = ParentNode([inner_node, LeafNode("Tail")], tag="div")
+        self.assertEqual(
+            list(outer_node.iter_html()),
+            ["<div>", "<span>", "Inner", "</span>", "Tail", "</div>"],
+        )
+
+    def test_deep_tree_renders_without_recursion(self):
+        depth = 50000
+        node = LeafNode("Deep")
+        for _ in range(depth):
+            node = ParentNode([node], tag="blockquote")
+        expected = "<blockquote>" * depth + "Deep" + "</blockquote>" * depth
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual("".join(node.iter_html()), expected)
+
+    def test_invalid_descendant_raises(self):
+        node = ParentNode([LeafNode("Fine"), ParentNode([], tag="ul")], tag="div")
+        with self.assertRaises(ValueError):
+            node.to_html()
+        with self.assertRaises(ValueError):
+            list(node.iter_html())
+
+    def test_other_node_types_render_themselves(self):
+        class Raw(HTMLNode):
+            __slots__ = ()
+
+            def to_html(self):
+                return self.value
+
+        node = ParentNode([Raw(value="<hr>"), LeafNode("x")], tag="div")
+        self.assertEqual(node.to_html(), "<div><hr>x</div>")
+        self.assertEqual(list(node.iter_html()), ["<div>", "<hr>", "x", "</div>"])
+
+    def test_write_html(self):
+        node = ParentNode([LeafNode("One", tag="b"), LeafNode("Two")], tag="p")
+        out = io.StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+# test_manifest.py
+
+import os
+import unittest
+
+from content import Page
+from fixtures import TempDirTestCase
+from manifest import BuildManifest, hash_file
+
+
+class TestBuildManifest(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.source = self.write_file("page.md", "# Page\n\nHello")
+        self.output = self.write_file("index.html", "<p>Hello</p>")
+        self.template = self.write_file("template.html", "{{ Content }}")
+        self.manifest_path = self.path("manifest.json")
+
+    def test_new_page_is_changed(self):
+        manifest = BuildManifest(self.manifest_path)
+        self.assertTrue(manifest.page_changed(self.source, self.output))
+
+    def test_recorded_page_is_unchanged(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record_page(self.source, self.output)
+        self.assertFalse(manifest.page_changed(self.source, self.output))
+
+    def test_dependency_change_invalidates_page(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record_page(self.source, self.output, [self.template])
+        self.assertFalse(manifest.page_changed(self.source, self.output))
+        self.write_file("template.html", "<main>{{ Content }}</main>")
+        self.assertTrue(manifest.page_changed(self.source, self.output))
+
+    def test_created_and_removed_dependencies_invalidate_page(self):
+        manifest = BuildManifest(self.manifest_path)
+        stylesheet = self.path("page.css")
+        manifest.record_page(self.source, self.output, [stylesheet])
+        self.assertFalse(manifest.page_changed(self.source, self.output))
+        self.write_file("page.css", "p {}")
+        self.assertTrue(manifest.page_changed(self.source, self.output))
+        manifest.record_page(self.source, self.output, [stylesheet])
+        os.remove(stylesheet)
+        self.assertTrue(manifest.page_changed(self.source, self.output))
+
+    def test_dependents(self):
+        manifest = BuildManifest(self.manifest_path)
+        other = self.write_file("other.md", "# Other\n\n[Page](/page)")
+        manifest.record_page(self.source, self.output, [self.template])
+        manifest.record_page(other, self.output, [self.template, self.source])
+        self.assertEqual(manifest.dependents(self.template), sorted([self.source, other]))
+        self.assertEqual(manifest.dependents(self.source), [other])
+        self.assertEqual(manifest.dependents(other), [])
+
+    def test_source_change_invalidates_page(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record_page(self.source, self.output)
+        self.write_file("page.md", "# Page\n\nHello, world")
+        self.assertTrue(manifest.page_changed(self.source, self.output))
+
+    def test_touched_source_is_unchanged(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record_page(self.source, self.output)
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertFalse(manifest.page_changed(self.source, self.output))
+
+    def test_missing_output_invalidates_page(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record_page(self.source, self.output)
+        os.remove(self.output)
+        self.assertTrue(manifest.page_changed(self.source, self.output))
+
+    def test_prune_pages(self):
+        kept = self.write_file("kept.md", "# Kept")
+        gone = self.write_file("gone.md", "# Gone")
+        moved = self.write_file("moved.md", "# Moved")
+        manifest = BuildManifest(self.manifest_path)
+        for source in (kept, gone, moved):
+            manifest.record_page(source, source + ".html")
+        pages = [Page(kept, kept + ".html", "", "kept"), Page(moved, moved + "/index.html", "", "moved")]
+        self.assertEqual(manifest.prune_pages(pages), sorted([gone + ".html", moved + ".html"]))
+        self.assertEqual(sorted(manifest.pages), sorted([kept, moved]))
+        self.assertTrue(manifest.page_changed(moved, moved + "/index.html"))
+
+    def test_asset_round_trip(self):
+        manifest = BuildManifest(self.manifest_path)
+        self.assertTrue(manifest.asset_changed(self.source, self.output))
+        manifest.record_asset(self.source, self.output)
+        self.assertFalse(manifest.asset_changed(self.source, self.output))
+
+    def test_save_and_load(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record_page(self.source, self.output, [self.template])
+        manifest.input_hash(self.source)
+        manifest.save()
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertEqual(loaded.pages, manifest.pages)
+        # Only inputs that pages depend on are kept
+        self.assertEqual(list(loaded.inputs), [self.template])
+        self.assertFalse(loaded.page_changed(self.source, self.output))
+
+    def test_load_missing_file(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+        self.assertEqual(manifest.assets, {})
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.source), hash_file(self.source))
+        self.assertNotEqual(hash_file(self.source), hash_file(self.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# test_output.py
+
+import os
+import unittest
+from fixtures import TempDirTestCase
+from output import OutputFile
+
+
+class TestOutputFile(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.html_path = self.path("index.html")
+
+    def write(self, *chunks):
+        with OutputFile(self.html_path) as out:
+            out.writelines(chunks)
+        return out
+
+    def read(self):
+        with open(self.html_path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_creates_file(self):
+        self.assertTrue(self.write("<p>", "héllo", "</p>\n").changed)
+        self.assertEqual(self.read(), "<p>héllo</p>\n")
+        self.assertEqual(os.listdir(self.tmp), ["index.html"])
+
+    def test_identical_output_is_not_rewritten(self):
+        self.write("<p>same</p>")
+        os.utime(self.html_path, ns=(10**9, 10**9))
+        self.assertFalse(self.write("<p>", "same", "</p>").changed)
+        self.assertEqual(os.stat(self.html_path).st_mtime_ns, 10**9)
+        self.assertEqual(os.listdir(self.tmp), ["index.html"])
+
+    def test_changed_output_replaces_file(self):
+        self.write("<p>old</p>")
+        # Same size, different content
+        self.assertTrue(self.write("<p>new</p>").changed)
+        self.assertEqual(self.read(), "<p>new</p>")
+
+    def test_failure_keeps_existing_file(self):
+        self.write("<p>old</p>")
+        with self.assertRaises(RuntimeError):
+            with OutputFile(self.html_path) as out:
+                out.write("<p>partial")
+                raise RuntimeError("boom")
+        self.assertEqual(self.read(), "<p>old</p>")
+        self.assertEqual(os.listdir(self.tmp), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
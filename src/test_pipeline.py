@@ -0,0 +1,81 @@
+# test_pipeline.py
+
+import threading
+import time
+import unittest
+from pipeline import run_stages
+
+
+def read(item):
+    if item == "unreadable":
+        raise OSError("can't read")
+    # Finish out of order
+    time.sleep(0.001 * (hash(item) % 3))
+    return item.upper()
+
+
+def render(item, data):
+    if item == "broken":
+        raise ValueError("can't render")
+    return f"<p>{data}</p>"
+
+
+def write(item, rendered):
+    if item == "unwritable":
+        raise OSError("can't write")
+    return len(rendered)
+
+
+class TestRunStages(unittest.TestCase):
+
+    def test_results_in_order(self):
+        items = [f"page{i}" for i in range(50)]
+        results = list(run_stages(items, read, render, write, depth=4))
+        self.assertEqual([result[0] for result in results], items)
+        self.assertEqual(results[0], ("page0", "<p>PAGE0</p>", 12, None))
+
+    def test_errors_are_reported_per_item(self):
+        items = ["a", "unreadable", "broken", "unwritable", "b"]
+        results = {item: (rendered, written, error) for item, rendered, written, error in run_stages(items, read, render, write)}
+        self.assertEqual(results["a"], ("<p>A</p>", 8, None))
+        self.assertEqual(results["b"], ("<p>B</p>", 8, None))
+        self.assertIsNone(results["unreadable"][0])
+        self.assertIsInstance(results["unreadable"][2], OSError)
+        self.assertIsInstance(results["broken"][2], ValueError)
+        # The page rendered, but couldn't be written
+        self.assertEqual(results["unwritable"][0], "<p>UNWRITABLE</p>")
+        self.assertIsInstance(results["unwritable"][2], OSError)
+
+    def test_reads_are_bounded(self):
+        started = []
+
+        def counting_read(item):
+            started.append(item)
+            return item
+
+        def slow_render(item, data):
+            time.sleep(0.002)
+            return data
+
+        stages = run_stages(range(100), counting_read, slow_render, write, depth=4)
+        next(stages)
+        time.sleep(0.05)
+        # The reader is held back by the bounded queue instead of reading everything
+        self.assertLess(len(started), 20)
+        stages.close()
+
+    def test_closing_early_stops_threads(self):
+        threads = threading.active_count()
+        stages = run_stages(range(100), lambda item: item, render, write, depth=2)
+        next(stages)
+        stages.close()
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_render_processes(self):
+        items = [f"page{i}" for i in range(20)]
+        results = list(run_stages(items, read, render, write, jobs=2, depth=3))
+        self.assertEqual([result[1] for result in results], [f"<p>{item.upper()}</p>" for item in items])
+
+
+if __name__ == "__main__":
+    unittest.main()
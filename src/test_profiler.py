@@ -0,0 +1,55 @@
+# test_profiler.py
+
+import unittest
+
+import profiler
+from profiler import SITE, BuildProfile
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(profiler.stop)
+
+    def test_timed_is_transparent_when_off(self):
+        @profiler.timed("phase")
+        def double(x):
+            return x * 2
+
+        self.assertIsNone(profiler.active())
+        self.assertEqual(double(2), 4)
+
+    def test_nested_phases_are_exclusive(self):
+        profile = profiler.start()
+        profile.page = "a.md"
+        with profiler.phase("outer"):
+            with profiler.phase("inner"):
+                pass
+        phases = profile.pages["a.md"]
+        self.assertEqual(set(phases), {"outer", "inner"})
+        self.assertGreaterEqual(phases["outer"], 0)
+
+    def test_recording_restores_active_profile(self):
+        outer = profiler.start()
+        with profiler.recording() as page_profile:
+            self.assertIs(profiler.active(), page_profile)
+            with profiler.phase("read"):
+                pass
+        self.assertIs(profiler.active(), outer)
+        self.assertIn("read", page_profile.pages[SITE])
+        with profiler.recording(False) as nothing:
+            self.assertIsNone(nothing)
+
+    def test_merge_and_report(self):
+        profile = BuildProfile()
+        profile.merge({"a.md": {"inline": 1.0, "read": 0.5}, "b.md": {"inline": 0.25}})
+        profile.add(SITE, "publish", 0.25)
+        self.assertEqual(profile.phase_totals(), {"inline": 1.25, "read": 0.5, "publish": 0.25})
+        report = profile.report(top=1)
+        self.assertIn("Slowest pages (1 of 2):", report)
+        self.assertIn("a.md", report)
+        self.assertNotIn("b.md", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# test_template.py
+
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template
+from utils import StreamedDocument, fill_template
+
+
+class TestTemplate(unittest.TestCase):
+
+    def test_segments(self):
+        template = Template("<title>{{ Title }}</title>{{Content}}")
+        self.assertEqual(
+            template.segments,
+            ["<title>", ("Title", "{{ Title }}"), "</title>", ("Content", "{{Content}}")],
+        )
+        self.assertEqual(template.names, {"Title", "Content"})
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1><p>{{ Title }} by {{ Author }}</p>")
+        self.assertEqual(
+            template.render({"Title": "Hobbit", "Author": "Tolkien"}),
+            "<h1>Hobbit</h1><p>Hobbit by Tolkien</p>",
+        )
+
+    def test_render_missing_value_keeps_placeholder(self):
+        template = Template("<p>{{ Title }}</p>")
+        self.assertEqual(template.render({}), "<p>{{ Title }}</p>")
+
+    def test_values_are_not_scanned_for_placeholders(self):
+        template = Template("<base href=\"/{{ Base }}\">{{ Content }}")
+        self.assertEqual(
+            template.render({"Base": "page/", "Content": "Use {{ Base }} here"}),
+            "<base href=\"/page/\">Use {{ Base }} here",
+        )
+
+    def test_write_streams_nodes(self):
+        template = Template("<article>{{ Content }}</article><p>{{ Title }}</p>")
+        node = ParentNode([LeafNode("Hi", tag="b")], tag="div")
+        out = io.StringIO()
+        template.write(out, {"Content": node, "Title": "Page"})
+        self.assertEqual(out.getvalue(), "<article><div><b>Hi</b></div></article><p>Page</p>")
+
+    def test_write_repeated_streamed_content(self):
+        template = Template("<main>{{ Content }}</main><noscript>{{ Content }}</noscript>")
+        self.assertEqual(template.repeated, {"Content"})
+        out = io.StringIO()
+        template.write(out, {"Content": StreamedDocument(["# Hi\n"])})
+        self.assertEqual(
+            out.getvalue(),
+            "<main><div><h1>Hi</h1></div></main><noscript><div><h1>Hi</h1></div></noscript>",
+        )
+
+    def test_fill_template(self):
+        self.assertEqual(
+            fill_template("T", "<p>C</p>", "b/", "s", "{{ Title }}{{ Content }}{{ Base }}{{ Style }}"),
+            "T<p>C</p>b/s",
+        )
+        self.assertEqual(
+            fill_template("T", "C", "", "s", "{{ Title }} - {{ Site }}", values={"Site": "Shire"}),
+            "T - Shire",
+        )
+
+
+class TestLoadTemplate(TempDirTestCase):
+
+    def test_load_template_is_cached_until_changed(self):
+        path = self.write_file("template.html", "<p>{{ Title }}</p>")
+        first = load_template(path)
+        self.assertIs(load_template(path), first)
+
+        self.write_file(path, "<h1>{{ Title }}</h1>")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        second = load_template(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({"Title": "x"}), "<h1>x</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
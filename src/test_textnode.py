@@ -9,6 +9,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", "bold")
         self.assertEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.LINK, "https://example.com")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(node.url, "https://example.com")
+
     def test_split_nodes_delimiter_basic(self):
         nodes = [TextNode("This is *italic* text", TextType.TEXT)]
         result = TextNode.split_nodes_delimiter(nodes, "*", TextType.ITALIC)
@@ -170,6 +175,27 @@ class TestTextNode(unittest.TestCase):
         expected = [TextNode("Some text", TextType.BOLD)]
         self.assertEqual(result, expected)
 
+    def test_split_nodes_images_and_links_repeated_link(self):
+        nodes = [TextNode("[a](u) and [a](u)", TextType.TEXT)]
+        result = TextNode.split_nodes_images_and_links(nodes)
+        expected = [
+            TextNode("a", TextType.LINK, url="u"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("a", TextType.LINK, url="u"),
+        ]
+        self.assertEqual(result, expected)
+
+    def test_split_nodes_images_and_links_image_matching_link(self):
+        # The link pattern must not also match inside the image
+        nodes = [TextNode("![a](u) [a](u)", TextType.TEXT)]
+        result = TextNode.split_nodes_images_and_links(nodes)
+        expected = [
+            TextNode("a", TextType.IMAGE, url="u"),
+            TextNode(" ", TextType.TEXT),
+            TextNode("a", TextType.LINK, url="u"),
+        ]
+        self.assertEqual(result, expected)
+
     def test_from_markdown_basic(self):
         text = "This is *italic* and **bold** text."
         result = TextNode.from_markdown(text)
@@ -228,6 +254,44 @@ class TestTextNode(unittest.TestCase):
         ]
         self.assertEqual(result, expected)
 
+    def test_from_markdown_literal_bold_inside_italic(self):
+        # Bold needs an even number of "**", so here they stay literal inside the italic span
+        text = "*a **b* c"
+        result = TextNode.from_markdown(text)
+        expected = [
+            TextNode("a *b", TextType.ITALIC),
+            TextNode(" c", TextType.TEXT),
+        ]
+        self.assertEqual(result, expected)
+
+    def test_from_markdown_unmatched_delimiter(self):
+        text = "This has an *unmatched star and **bold** text"
+        result = TextNode.from_markdown(text)
+        expected = [
+            TextNode("This has an *unmatched star and ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode(" text", TextType.TEXT),
+        ]
+        self.assertEqual(result, expected)
+
+    def test_from_markdown_empty_text(self):
+        self.assertEqual(TextNode.from_markdown(""), [])
+
+    def test_from_markdown_matches_chained_passes(self):
+        texts = [
+            "***bold and italic***",
+            "a****b and `*not italic*`",
+            "**a** *b* `c` [d](e) ![f](g) **",
+            "*start* middle **end**",
+        ]
+        for text in texts:
+            nodes = [TextNode(text, TextType.TEXT)]
+            nodes = TextNode.split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = TextNode.split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+            nodes = TextNode.split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = TextNode.split_nodes_images_and_links(nodes)
+            self.assertEqual(TextNode.from_markdown(text), nodes)
+
 
 if __name__ == "__main__":
     unittest.main()
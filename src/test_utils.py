@@ -1,8 +1,16 @@
 # test_utils.py
 
+import io
+import os
 import unittest
 from utils import *
 from htmlnode import *
+from copier import copy_file
+from utils import _memoized_inline
+from content import Page, index_content
+import profiler
+from manifest import BuildManifest
+from fixtures import TempDirTestCase
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -246,5 +254,168 @@ This is a paragraph with *italic* and [a link](https://www.google.com).
         self.maxDiff = None
         # self.assertEqual(html_node.to_html(), expected_html)
 
+    def test_fenced_code_keeps_indentation_and_empty_lines(self):
+        markdown = "# Code\n\n``` js\nif (x) {\n  y();\n\n}\n```\n\nDone."
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            '<div><h1>Code</h1><pre><code class="js">if (x) {\n  y();\n\n}\n</code></pre><p>Done.</p></div>',
+        )
+
+
+class TestInlineMemo(TempDirTestCase):
+
+    def test_repeated_span_is_reused(self):
+        text = "A [memo test](/memo) span with **bold** text"
+        first = inline_to_html_nodes(text)
+        hits = _memoized_inline.cache_info().hits
+        second = inline_to_html_nodes(text)
+        self.assertEqual(_memoized_inline.cache_info().hits, hits + 1)
+        self.assertEqual([node.to_html() for node in first], [node.to_html() for node in second])
+        # Callers get their own list of the shared nodes
+        self.assertIsNot(first, second)
+
+    def test_long_span_is_not_memoized(self):
+        text = "word " * INLINE_MEMO_MAX_LENGTH
+        info = _memoized_inline.cache_info()
+        inline_to_html_nodes(text)
+        inline_to_html_nodes(text)
+        self.assertEqual(_memoized_inline.cache_info(), info)
+
+    def test_render_page_counts_memo_lookups(self):
+        result = render_page("content/does-not-exist.md", self.path("index.html"))
+        self.assertEqual(result.memo, {"hits": 0, "misses": 0})
+
+
+class TestStreamedDocument(unittest.TestCase):
+
+    MARKDOWN = "# Title\n\nSome **bold** text.\n\n```\ncode\n\n  more\n```\n\n- a\n- b\n"
+
+    def test_matches_markdown_to_html_node(self):
+        lines = io.StringIO(self.MARKDOWN)
+        self.assertEqual(
+            StreamedDocument(lines).to_html(),
+            markdown_to_html_node(self.MARKDOWN).to_html(),
+        )
+
+    def test_reads_lazily(self):
+        lines = iter(self.MARKDOWN.splitlines(keepends=True))
+        chunks = StreamedDocument(lines).iter_html()
+        self.assertEqual(next(chunks), "<div>")
+        next(chunks)
+        # Only the first block and the line that ended it have been read
+        self.assertEqual(next(lines), "Some **bold** text.\n")
+
+    def test_serializes_once(self):
+        document = StreamedDocument(io.StringIO(self.MARKDOWN))
+        document.to_html()
+        with self.assertRaises(Exception):
+            document.to_html()
+
+class TestRenderPage(TempDirTestCase):
+
+    def test_render_page_captures_error(self):
+        result = render_page("content/does-not-exist.md", self.path("index.html"))
+        self.assertIn("FileNotFoundError", result.error)
+        self.assertIn("!-- Error converting Markdown to HTML", result.records[-1]["msg"])
+        self.assertEqual(result.records[-1]["page"], "content/does-not-exist.md")
+        self.assertEqual(os.listdir(self.tmp), [])
+
+    def test_build_error_report(self):
+        error = BuildError([("content/a.md", "Exception: boom")])
+        self.assertEqual(
+            error.report(),
+            "!-- 1 page(s) failed to render.\n\t- content/a.md: Exception: boom",
+        )
+
+    def test_profiled_build_times_reads_and_writes(self):
+        self.write_file("content/index.md", "# Home\n\nHello.\n")
+        template_path = self.write_file("template.html", "{{ Title }}{{ Content }}")
+        pages, problems = index_content(self.path("content"), self.path("static"))
+
+        profile = profiler.start()
+        self.addCleanup(profiler.stop)
+        render_pages(pages, {}, template_path=template_path)
+        phases = profile.pages[pages[0].source]
+        self.assertGreater(phases["read"], 0.0)
+        self.assertGreater(phases["write"], 0.0)
+
+
+class TestPageDependencies(unittest.TestCase):
+
+    def test_find_links(self):
+        lines = [
+            "# Title\n",
+            "Read [this](/majesty) and [that](page1/) or [this](/majesty) again.\n",
+            "![image](/images/rivendell.png) [elsewhere](https://example.com)\n",
+        ]
+        self.assertEqual(find_links(lines), ["/majesty", "page1/", "https://example.com"])
+
+    def test_page_dependencies(self):
+        page = Page("content/guides/usage.md", "static/guides/usage/index.html", "guides/usage/", "usage")
+        sources = {
+            "static/index.html": "content/index.md",
+            "static/guides/install/index.html": "content/guides/install.md",
+            page.output: page.source,
+        }
+        links = ["/", "../install/", "/majesty#top", "/images/a.png", "https://example.com", "#top", "/guides/usage/"]
+        self.assertEqual(
+            page_dependencies(page, links, sources),
+            [
+                "content/guides/install.md",
+                "content/index.md",
+                "static/guides/usage/usage.css",
+                "static/images/a.png",
+                "static/majesty/index.html",
+                "template.html",
+            ],
+        )
+
+
+class TestPublishSync(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.static = self.path("static")
+        self.public = self.path("public")
+        os.makedirs(os.path.join(self.static, "keep"))
+        os.makedirs(os.path.join(self.public, "keep"))
+        os.makedirs(os.path.join(self.public, "gone"))
+
+    def test_file_outdated(self):
+        source = os.path.join(self.static, "a.css")
+        target = os.path.join(self.public, "a.css")
+        self.write_file(source, "body {}")
+        self.assertTrue(file_outdated(source, target))
+        copy_file(source, target)
+        self.assertFalse(file_outdated(source, target))
+
+    def test_file_outdated_on_change(self):
+        source = os.path.join(self.static, "a.css")
+        target = os.path.join(self.public, "a.css")
+        self.write_file(source, "body {}")
+        copy_file(source, target)
+        self.write_file(source, "body { color: red; }")
+        self.assertTrue(file_outdated(source, target))
+
+    def test_remove_orphans(self):
+        self.write_file(os.path.join(self.static, "keep", "page.html"), "x")
+        self.write_file(os.path.join(self.public, "keep", "page.html"), "x")
+        self.write_file(os.path.join(self.public, "keep", "old.html"), "x")
+        self.write_file(os.path.join(self.public, "gone", "page.html"), "x")
+        remove_orphans(self.static, self.public)
+        self.assertEqual(os.listdir(self.public), ["keep"])
+        self.assertEqual(os.listdir(os.path.join(self.public, "keep")), ["page.html"])
+
+    def test_publish_twice_with_links(self):
+        source = os.path.join(self.static, "keep", "a.css")
+        manifest = BuildManifest(self.path("manifest.json"))
+        for text in ("body {}", "body { color: red; }"):
+            # Edited in place, so the second time the published link already has the new data
+            self.write_file(source, text)
+            publish_static_content(
+                manifest, link=True, static_root=self.static, public_root=self.public
+            )
+        self.assertEqual(sorted(os.listdir(os.path.join(self.public, "keep"))), ["a.css"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+# test_validate.py
+
+import unittest
+from fixtures import TempDirTestCase
+from utils import generate_html_document
+from validate import validate_page, validate_pages
+
+
+class TestValidatePage(TempDirTestCase):
+
+    def write(self, markdown, name="page.md"):
+        return self.write_file(name, markdown)
+
+    def test_valid_page(self):
+        source = self.write(
+            "# Title\n\nSome **bold**, *italic* and `code` text.\n\n"
+            "```python\nx = 2 * 3\n```\n\n* one `*`\n* two\n\n1. one\n2. **two**\n"
+        )
+        self.assertEqual(validate_page(source), ([], []))
+
+    def test_missing_title(self):
+        errors, warnings = validate_page(self.write("Title\n\nText\n"))
+        self.assertEqual(errors, ["line 1: The page must begin with a '# ' title."])
+
+    def test_empty_page(self):
+        errors, warnings = validate_page(self.write(""))
+        self.assertEqual(errors, ["line 1: The page must begin with a '# ' title."])
+
+    def test_malformed_headings(self):
+        errors, warnings = validate_page(self.write("# Title\n\n####### Seven\n\n#NoSpace\n"))
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith("line 3: Malformed heading"))
+        self.assertTrue(errors[1].startswith("line 5: Malformed heading"))
+
+    def test_unclosed_fence(self):
+        errors, warnings = validate_page(self.write("# Title\n\nText\n\n```\ncode\n\nmore\n"))
+        self.assertEqual(errors, ["line 5: Code fence is never closed."])
+
+    def test_fence_closed_on_opening_line(self):
+        errors, warnings = validate_page(self.write("# Title\n\n```code```\n"))
+        self.assertEqual(errors, ["line 3: Code fence must be closed on its own line."])
+
+    def test_unbalanced_delimiters_are_warnings(self):
+        errors, warnings = validate_page(
+            self.write("# Title\n\nSome **bold text.\n\n- a `b\n- *c*\n- d*\n")
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            warnings,
+            [
+                "line 3: Unbalanced '**' is rendered as text.",
+                "line 5: Unbalanced '`' is rendered as text.",
+                "line 7: Unbalanced '*' is rendered as text.",
+            ],
+        )
+
+    def test_validate_pages_reports_every_page(self):
+        good = self.write("# Good\n", "good.md")
+        bad = self.write("Bad\n\n```\n", "bad.md")
+        missing = self.path("missing.md")
+        for jobs in (1, 2):
+            errors, warnings = validate_pages([good, bad, missing], jobs=jobs)
+            self.assertEqual([source for source, error in errors], [bad, bad, missing])
+            self.assertIn("FileNotFoundError", errors[2][1])
+
+    def test_blocks_that_render_nothing(self):
+        template = self.write_file("template.html", "{{ Content }}")
+        for body, line in (
+            (">", 3),
+            ("> ", 3),
+            ("**", 3),
+            ("Text\n\n``****", 5),
+            ("- one\n- **", 4),
+            ("1. **\n2. two", 3),
+            ("## **", 3),
+        ):
+            source = self.write(f"# Title\n\n{body}\n")
+            errors, warnings = validate_page(source)
+            self.assertEqual(len(errors), 1, body)
+            self.assertTrue(errors[0].startswith(f"line {line}: Nothing to render"), errors)
+            self.assertEqual(warnings, [])
+            # Exactly what rendering fails on
+            with self.assertRaises(ValueError):
+                generate_html_document(source, template_path=template)
+
+    def test_delimiters_with_text_render(self):
+        template = self.write_file("template.html", "{{ Content }}")
+        source = self.write("# Title\n\n** **\n\n> *\n")
+        self.assertEqual(validate_page(source), ([], ["line 5: Unbalanced '*' is rendered as text."]))
+        generate_html_document(source, template_path=template)
+
+
+if __name__ == "__main__":
+    unittest.main()
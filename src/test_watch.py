@@ -0,0 +1,73 @@
+# test_watch.py
+
+import contextlib
+import io
+import os
+import unittest
+
+from builder import Site
+from buildlog import logger
+from fixtures import TempDirTestCase
+from watch import Watcher, diff_snapshots, snapshot
+
+
+class TestSnapshot(TempDirTestCase):
+
+    def test_snapshot_indexes_nested_files(self):
+        for name in ("top.md", os.path.join("a", "b", "deep.md")):
+            self.write_file(name, "x")
+        files = snapshot([self.tmp, self.path("missing")])
+        self.assertEqual(
+            sorted(files),
+            [self.path(os.path.join("a", "b", "deep.md")), self.path("top.md")],
+        )
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["b", "d"], ["c"]))
+
+
+class TestWatcher(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_file("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write_file("static/index.css", "body {}")
+        self.write_file("content/index.md", "# Home\n")
+        self.write_file("content/guide/install.md", "# Install\n")
+        self.write_file("content/guide/usage.md", "# Usage\n")
+        self.site = Site(self.tmp, cache=None)
+        self.site.build()
+        self.watcher = Watcher(self.site)
+        self.out = io.StringIO()
+        self.enterContext(contextlib.redirect_stdout(self.out))
+
+    def test_poll_rebuilds_changed_page(self):
+        before = snapshot([self.site.static_root, self.site.public_root])
+        self.write_file("content/guide/usage.md", "# Usage\n\nUse it.\n")
+        self.watcher.poll()
+        changed, removed = diff_snapshots(before, snapshot([self.site.static_root, self.site.public_root]))
+        self.assertEqual(
+            changed,
+            [self.path("public/guide/usage/index.html"), self.path("static/guide/usage/index.html")],
+        )
+        self.assertEqual(removed, [])
+        self.assertIn("rendered 1 page(s)", self.out.getvalue())
+        # The rendered page isn't seen as a change by the next poll
+        self.watcher.poll()
+        self.assertEqual(self.out.getvalue().count("change(s)"), 1)
+
+    def test_poll_survives_failed_rebuild(self):
+        def build(changed_paths=None, full=False):
+            raise PermissionError("public is read-only")
+
+        self.site.build = build
+        self.write_file("content/index.md", "# Home again\n")
+        with self.assertLogs(logger, "ERROR"):
+            self.watcher.poll()
+        self.assertIn("Rebuild failed", self.out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,16 @@
 # textnode.py
 from enum import Enum
+from bisect import bisect_left, bisect_right
 import re
+from profiler import timed
+
+# Star runs and backticks: everything the inline delimiters are made of
+_INLINE_TOKEN_RE = re.compile(r"\*+|`")
+_STAR_RUN_RE = re.compile(r"\*+")
+_IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+# Images and links in one scan: group 1 is "!" for an image, empty for a link
+_IMAGE_OR_LINK_RE = re.compile(r"(!?)\[([^\[\]]*)\]\(([^\(\)]*)\)")
 
 class TextType(Enum):
     TEXT = 1
@@ -13,7 +23,12 @@ class TextType(Enum):
 class TextNode():
     """
     Represents a substring in a Markdown document and its style.
+
+    Uses `__slots__`: a page can have many thousands of these, so they carry no
+    per-instance `__dict__`.
     """
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -28,21 +43,87 @@ class TextNode():
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
     @classmethod
+    @timed("inline")
     def from_markdown(cls, text):
         """
         Creates a list of TextNode objects from a Markdown text string.
 
+        The text is tokenized once: a single regex scan finds every star run and
+        backtick. Bold, italic and code spans are then resolved from those tokens,
+        each level only looking at the plain-text segments the previous level left,
+        and images and links are split out of whatever plain text remains. The
+        result is the same as running `split_nodes_delimiter` for "**", "*" and "`"
+        followed by `split_nodes_images_and_links`, in linear time.
+
         Args:
             text (str): The Markdown text to parse.
 
         Returns:
             list: A list of TextNode objects representing the parsed Markdown text.
         """
-        nodes = [TextNode(text, TextType.TEXT)]
-        nodes = cls.split_nodes_delimiter(nodes, "**", TextType.BOLD)
-        nodes = cls.split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-        nodes = cls.split_nodes_delimiter(nodes, "`", TextType.CODE)
-        nodes = cls.split_nodes_images_and_links(nodes)
+        runs = []
+        ticks = []
+        for match in _INLINE_TOKEN_RE.finditer(text):
+            if match.group() == "`":
+                ticks.append(match.start())
+            else:
+                runs.append(match.span())
+        run_ends = [end for start, end in runs]
+
+        def clipped_runs(start, end):
+            # Star runs inside text[start:end], cut at the segment's edges
+            i = bisect_right(run_ends, start)
+            while i < len(runs) and runs[i][0] < end:
+                yield max(runs[i][0], start), min(runs[i][1], end)
+                i += 1
+
+        def bold_positions(start, end):
+            positions = []
+            for run_start, run_end in clipped_runs(start, end):
+                positions.extend(range(run_start, run_end - 1, 2))
+            return positions
+
+        def italic_positions(start, end):
+            positions = []
+            for run_start, run_end in clipped_runs(start, end):
+                if run_start == start:
+                    # A leading "*" always opens, even when it starts a "**"
+                    positions.append(run_start)
+                    run_start += 1
+                # Pairs of stars are literal "**"; an odd one out is a delimiter
+                if (run_end - run_start) % 2:
+                    positions.append(run_end - 1)
+            return positions
+
+        def code_positions(start, end):
+            return ticks[bisect_left(ticks, start) : bisect_left(ticks, end)]
+
+        levels = (
+            (bold_positions, "**", TextType.BOLD),
+            (italic_positions, "*", TextType.ITALIC),
+            (code_positions, "`", TextType.CODE),
+        )
+        nodes = []
+
+        def scan(start, end, level):
+            if level == len(levels):
+                segment = TextNode(text[start:end], TextType.TEXT)
+                # Images and links both need a "](", so most segments can skip the regexes
+                if "](" in segment.text:
+                    nodes.extend(cls.split_nodes_images_and_links([segment]))
+                else:
+                    nodes.append(segment)
+                return
+            find_positions, delimiter, text_type = levels[level]
+            for part in cls._split_delimited(
+                text, start, end, find_positions(start, end), delimiter, text_type
+            ):
+                if isinstance(part, TextNode):
+                    nodes.append(part)
+                else:
+                    scan(part[0], part[1], level + 1)
+
+        scan(0, len(text), 0)
         return nodes
 
     @staticmethod
@@ -84,53 +165,90 @@ class TextNode():
         new_nodes = []
         for node in old_nodes:
             if node.text_type == TextType.TEXT:
-                parts = []
-                text = ""
-                delimiter_count = 0
-                i = 0
-
-                # Handle the case where the text begins with a delimiter
-                if node.text.startswith(delimiter):
-                    parts.append("")
-                    delimiter_count += 1
-                    i += len(delimiter)
-
-                while i < len(node.text):
-                    if delimiter == "*" and i < len(node.text) - 1 and node.text[i] == "*" and node.text[i + 1] == "*":  # Check for "**"
-                        text += "**"  # Add "**" to the text part
-                        i += 2  # Skip the "**"
-                    elif node.text[i:i + len(delimiter)] == delimiter:
-                        if text:
-                            parts.append(text)
-                        text = ""
-                        delimiter_count += 1
-                        i += len(delimiter)
+                text = node.text
+                positions = TextNode._delimiter_positions(text, delimiter)
+                for part in TextNode._split_delimited(
+                    text, 0, len(text), positions, delimiter, text_type
+                ):
+                    if isinstance(part, TextNode):
+                        new_nodes.append(part)
+                    elif part == (0, len(text)):
+                        new_nodes.append(node)
                     else:
-                        text += node.text[i]
-                        i += 1
-                parts.append(text)
-
-                if delimiter_count % 2 == 0:
-                    text_parts = parts[::2]
-                    code_parts = parts[1::2]
-                    for text, code in zip(text_parts, code_parts + [""]):
-                        if text:
-                            new_nodes.append(TextNode(text, TextType.TEXT))
-                        if code:
-                            new_nodes.append(TextNode(code.replace(delimiter, "", 1), text_type))
-                else:
-                    new_nodes.append(node)
+                        new_nodes.append(TextNode(text[part[0] : part[1]], TextType.TEXT))
             else:
                 new_nodes.append(node)
 
         return new_nodes
 
+    @staticmethod
+    def _delimiter_positions(text, delimiter):
+        """
+        Finds where a delimiter occurs in a text string, scanning left to right
+        without overlaps. For "*", a "**" pair is literal text unless it starts
+        the string, in which case its first star is a delimiter.
+        """
+        if delimiter == "*":
+            positions = []
+            for match in _STAR_RUN_RE.finditer(text):
+                run_start, run_end = match.span()
+                if run_start == 0:
+                    positions.append(0)
+                    run_start = 1
+                if (run_end - run_start) % 2:
+                    positions.append(run_end - 1)
+            return positions
+
+        positions = []
+        i = text.find(delimiter)
+        while i != -1:
+            positions.append(i)
+            i = text.find(delimiter, i + len(delimiter))
+        return positions
+
+    @staticmethod
+    def _split_delimited(text, start, end, positions, delimiter, text_type):
+        """
+        Splits text[start:end] at the given delimiter positions.
+
+        Delimited parts become TextNode objects of text_type. Plain-text parts are
+        returned as (start, end) spans so the caller can keep splitting them.
+        With an odd number of delimiters nothing is split and the whole span is
+        returned. Empty parts are dropped, like the text between two adjacent
+        delimiters, which shifts the parts that follow.
+
+        Returns:
+            list: TextNode objects and (start, end) tuples, in text order.
+        """
+        if len(positions) % 2:
+            return [(start, end)]
+
+        spans = []
+        last = start
+        for i, position in enumerate(positions):
+            # Handle the case where the text begins with a delimiter
+            if position > last or (i == 0 and position == start):
+                spans.append((last, position))
+            last = position + len(delimiter)
+        spans.append((last, end))
+
+        parts = []
+        for i, (part_start, part_end) in enumerate(spans):
+            if part_start == part_end:
+                continue
+            if i % 2 == 0:
+                parts.append((part_start, part_end))
+            else:
+                part = text[part_start:part_end].replace(delimiter, "", 1)
+                parts.append(TextNode(part, text_type))
+        return parts
+
     @staticmethod
     def split_nodes_images_and_links(old_nodes):
         """
         Splits text nodes based on the presence of Markdown images or links.
 
-        This function uses the helper methods `_extract_image_parts`, `_extract_link_parts`,
+        This function uses the helper methods `_extract_image_and_link_parts`
         and `_split_text_by_parts` to identify and split image and link nodes.
 
         Args:
@@ -142,9 +260,7 @@ class TextNode():
         new_nodes = []
         for node in old_nodes:
             if node.text_type == TextType.TEXT:
-                image_parts = TextNode._extract_image_parts(node.text)
-                link_parts = TextNode._extract_link_parts(node.text)
-                all_parts = image_parts + link_parts
+                all_parts = TextNode._extract_image_and_link_parts(node.text)
 
                 if all_parts:
                     new_nodes.extend(TextNode._split_text_by_parts(node.text, all_parts))
@@ -155,39 +271,29 @@ class TextNode():
         return new_nodes
 
     @staticmethod
-    def _extract_image_parts(text):
-        """
-        Extracts image parts from a text string.
+    def _extract_image_and_link_parts(text):
         """
-        parts = []
-        for alt_text, url in TextNode._extract_markdown_images(text):
-            for match in re.finditer(re.escape(f"![{alt_text}]({url})"), text):
-                start, end = match.span()
-                # Add a marker to indicate it's an image part
-                parts.append((start, end, alt_text, url, "image"))  
-        return parts
+        Extracts image and link parts from a text string in a single scan.
 
-    @staticmethod
-    def _extract_link_parts(text):
-        """
-        Extracts link parts from a text string.
+        Returns:
+            list: (start, end, text, url, part_type) tuples in text order, where part_type is "image" or "link".
         """
         parts = []
-        for link_text, url in TextNode._extract_markdown_links(text):
-            for match in re.finditer(re.escape(f"[{link_text}]({url})"), text):
-                start, end = match.span()
-                # Add a marker to indicate it's a link part
-                parts.append((start, end, link_text, url, "link"))  
+        for match in _IMAGE_OR_LINK_RE.finditer(text):
+            start, end = match.span()
+            part_type = "image" if match.group(1) else "link"
+            parts.append((start, end, match.group(2), match.group(3), part_type))
         return parts
 
     @staticmethod
     def _split_text_by_parts(text, parts):
         """
         Splits a text string into parts based on the given parts list.
+        The parts must be in text order and must not overlap.
         """
         nodes = []
         last_end = 0
-        for start, end, text_content, url, part_type in sorted(parts):  # Include part_type
+        for start, end, text_content, url, part_type in parts:
             if text[last_end:start]:
                 nodes.append(TextNode(text[last_end:start], TextType.TEXT))
             # Determine node type based on part_type
@@ -200,12 +306,8 @@ class TextNode():
 
     @staticmethod
     def _extract_markdown_images(text):
-        pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-        matches = re.findall(pattern, text)
-        return matches
+        return _IMAGE_RE.findall(text)
 
     @staticmethod
     def _extract_markdown_links(text):
-        pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-        matches = re.findall(pattern, text)
-        return matches
+        return _LINK_RE.findall(text)
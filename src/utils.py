@@ -1,10 +1,28 @@
 # utils.py
 
+import io
+import itertools
 import re
 import os
 import shutil
-from htmlnode import HTMLNode, ParentNode, LeafNode
+import time
+import logging
+from functools import lru_cache, partial
+from urllib.parse import urlsplit
+from htmlnode import HTMLNode, ParentNode, LeafNode, escape_text
 from textnode import TextNode
+from copier import copy_tree
+from output import OutputFile
+from pipeline import run_stages
+from template import Template, load_template
+from blocks import scan_blocks, scan_lines
+from content import CONTENT_DIR, OUTPUT_DIR, index_content
+from validate import validate_pages
+from buildlog import capture_records, logger, replay
+import profiler
+from profiler import timed
+
+TEMPLATE_PATH = "template.html"
 
 
 def extract_title(markdown: str):
@@ -15,70 +33,34 @@ def extract_title(markdown: str):
     raise Exception("!-- Failed: MD file must begin with h1.")
 
 
-def publish_static_content():
-    public_root = "public"
-    static_root = "static"
-
-    print(f"\n---Publishing contents of '{static_root}' to '{public_root}'.---\n")
-
-    def copy_directory(static_dir):
-        nonlocal public_root
-        files_copied = 0
-
-        def copy_file(files, public_dir):
-            """
-            Copies one file to a target directory recursively from a list of files.
-
-            Args:
-                files (list): Strings of file paths of files to copy
-                public_dir (str): The directory where files will be copied to
-            """
-            nonlocal files_copied
-            nonlocal static_dir
-
-            if len(files) < 1:
-                print(f"\t> Copied {files_copied} files to {public_dir}.")
-                return
-
-            filename = files.pop()
-            # Extract the relative path within the static directory
-            file_path = os.path.join(static_dir, filename)
-            relative_path = os.path.relpath(file_path, static_root)
-            new_path = os.path.join(public_root, relative_path)
-
-            # Copy the file to the new location
-            shutil.copy(file_path, new_path)
-            print(f"\t\t+ Copied {file_path} to {new_path}.")
-
-            files_copied += 1
-            copy_file(files, public_dir)  # Repeats until the list of files is empty
-
-        print(f"> Copying files in '{static_dir}'.")
+def publish_static_content(
+    manifest=None, clean=False, jobs=None, link=False, static_root="static", public_root="public"
+):
+    """
+    Publishes the contents of 'static' to 'public'.
 
-        public_dir = ""  # Root directory
-        if not static_dir == static_root:
-            relative_path = os.path.relpath(static_dir, static_root)
-            public_dir = os.path.join(public_root, relative_path)
-            # Create directory in public matching static path
-            if not os.path.exists(public_dir):
-                os.mkdir(public_dir)
-                print(f"\t\t+ Created dir '{public_dir}'.")
+    By default 'public' is synced rather than rebuilt: only new or changed files
+    are copied, files that no longer exist in 'static' are removed, and every copy
+    is written to a temporary file first and moved into place with `os.replace`,
+    so 'public' can keep being served while it is published. 'static' is walked
+    once and files are copied on a thread pool.
 
-        # Build list of files in the current directory
-        file_paths = []
-        with os.scandir(static_dir) as contents:
-            for file in contents:
-                if file.is_file():
-                    file_paths.append(file.name)
-                elif file.is_dir():
-                    copy_directory(file.path)
+    Args:
+        manifest (BuildManifest, optional): When given, files are compared by the hashes recorded at the last publish and every copy is recorded. Otherwise a file is copied when its size or mtime differs from the published copy.
+        clean (bool, optional): Empty 'public' first and copy everything.
+        jobs (int, optional): Number of copy threads.
+        link (bool, optional): Hard link files into 'public' instead of copying them where possible.
+        static_root (str, optional): The directory to publish.
+        public_root (str, optional): The directory to publish to.
 
-        # Start copying
-        copy_file(file_paths, public_dir)
+    Returns:
+        CopyStats: What was copied and how fast.
+    """
+    logger.info(f"---Publishing contents of '{static_root}' to '{public_root}'.---")
 
     if not os.path.exists(static_root):
         raise FileNotFoundError(f"!-- No directory found at '{static_root}'!")
-    if os.path.exists(public_root):
+    if clean and os.path.exists(public_root):
         for filename in os.listdir(public_root):
             filepath = os.path.join(public_root, filename)
             try:
@@ -87,135 +69,841 @@ def publish_static_content():
                 elif os.path.isdir(filepath):
                     shutil.rmtree(filepath)
             except Exception as e:
-                print(f"Failed to delete {filepath}. Reason: {e}")
-        print("- Emptied '/public' directory.")
-
-    copy_directory(static_root)
-    print("\n--- Done. Pages are ready to serve. ---\n")
-
-
-def generate_static_content():
-    """
-    Reads the contents of the 'content' directory, then creates directories and generates html files in 'static' for each markdown file found in each subdirectory and in the root of 'content'.
-    """
-    with os.scandir("content") as files:
-        for dir_entry in files:
-            target_path = ""
-            html_path = ""
-
-            # Process root index.md file
-            if dir_entry.is_file() and dir_entry.name.endswith(".md"):
-                target_path = "content/index.md"
-                html_path = "static/index.html"
-
-            # Process content file in subdir
-            elif not dir_entry.is_file():
-                with os.scandir(dir_entry.path) as pages:
-                    page_paths = []
-                    for entry in pages:
-                        page_paths.append(entry.path)
-                    if not len(page_paths) == 1:
-                        print(
-                            f"!-- Must be exactly one file per subdirectory in 'content/': "
-                            + dir_entry.path
-                        )
-                        break
-                    md_file = page_paths[0]
-                    if not md_file.endswith(".md"):
-                        print("!-- Content must be a '.md' file: " + md_file)
-                        break
-
-                    target_path = md_file
-                    relative_path = os.path.relpath(md_file, "content")
-                    # eg. "page_directory/page_content.md"
-                    head, tail = os.path.split(relative_path)
-                    # eg. ("page_directory/", "page_content.md")
-
-                    # NOTE: This names all docs as "index.html"
-                    html_path = os.path.join("static/", head, "index.html")
-                    # For custom named html documents:
-                    # html_path = os.path.join("static/", head, tail.strip(".md") + ".html")
-                    # eg. "static/page_directory/page_content.html"
-                    new_dir = os.path.dirname(html_path)
-
-                    # Make sure directory exists
-                    if not os.path.exists(new_dir):
-                        os.mkdir(new_dir)
-
-            if target_path == "":
-                print(
-                    "!!! Something went wrong while getting the target path to convert the MD file to HTML. (This should literally never happen.)"
+                logger.warning(f"Failed to delete {filepath}. Reason: {e}")
+        logger.info(f"- Emptied '{public_root}' directory.")
+
+    def should_copy(file_path, new_path):
+        if manifest is not None:
+            return manifest.asset_changed(file_path, new_path)
+        return file_outdated(file_path, new_path)
+
+    with profiler.phase("publish"):
+        if not clean and os.path.exists(public_root):
+            remove_orphans(static_root, public_root, manifest)
+        stats = copy_tree(static_root, public_root, should_copy, jobs=jobs, link=link)
+
+    for relative_path, size, method in stats.copied:
+        file_path = os.path.join(static_root, relative_path)
+        new_path = os.path.join(public_root, relative_path)
+        logger.debug(f"\t\t+ Copied {file_path} to {new_path} ({method}).")
+        if manifest is not None:
+            manifest.record_asset(file_path, new_path)
+    logger.info(
+        f"> {stats.summary()}",
+        extra={"files": len(stats.copied), "bytes": stats.bytes, "seconds": stats.seconds},
+    )
+
+    logger.info("--- Done. Pages are ready to serve. ---")
+    return stats
+
+
+def file_outdated(source, target):
+    """
+    Checks whether a published copy is missing or differs from its source by size or mtime.
+
+    Args:
+        source (str): The path to the file in 'static'.
+        target (str): The path of its copy in 'public'.
+
+    Returns:
+        bool: True if the file has to be copied.
+    """
+    try:
+        target_stat = os.stat(target)
+    except OSError:
+        return True
+    source_stat = os.stat(source)
+    return (
+        source_stat.st_size != target_stat.st_size
+        or source_stat.st_mtime_ns != target_stat.st_mtime_ns
+    )
+
+
+def remove_orphans(static_root, public_root, manifest=None):
+    """
+    Removes files and directories from 'public' that have no counterpart in 'static'.
+
+    Args:
+        static_root (str): The source directory.
+        public_root (str): The published directory.
+        manifest (BuildManifest, optional): Records of removed files are dropped from it.
+    """
+    removed = 0
+    for public_dir, dir_names, file_names in os.walk(public_root):
+        static_dir = os.path.join(static_root, os.path.relpath(public_dir, public_root))
+        for name in list(dir_names):
+            if not os.path.isdir(os.path.join(static_dir, name)):
+                shutil.rmtree(os.path.join(public_dir, name))
+                dir_names.remove(name)
+                logger.debug(f"\t\t- Removed dir '{os.path.join(public_dir, name)}'.")
+                removed += 1
+        for name in file_names:
+            if not os.path.isfile(os.path.join(static_dir, name)):
+                os.unlink(os.path.join(public_dir, name))
+                logger.debug(f"\t\t- Removed '{os.path.join(public_dir, name)}'.")
+                removed += 1
+
+    if manifest is not None:
+        for source in list(manifest.assets):
+            if not os.path.isfile(source):
+                del manifest.assets[source]
+    logger.info(f"- Removed {removed} orphaned entries from '{public_root}'.")
+
+
+class BuildError(Exception):
+    """
+    Raised after a build in which one or more pages failed to render.
+
+    Attributes:
+        errors (list): (source path, error message) pairs, in build order.
+        written (list): Paths of the html files that did render.
+    """
+
+    def __init__(self, errors, message=None, written=()):
+        self.errors = errors
+        self.written = list(written)
+        super().__init__(message or f"{len(errors)} page(s) failed to render.")
+
+    def report(self):
+        """
+        Returns:
+            str: One line per failed page.
+        """
+        lines = [f"!-- {self}"]
+        for source, error in self.errors:
+            lines.append(f"\t- {source}: {error}")
+        return "\n".join(lines)
+
+
+def remove_stale_pages(manifest, pages, static_root=OUTPUT_DIR, public_root=None):
+    """
+    Forgets removed pages and deletes the html files no page renders to
+    anymore, see `BuildManifest.prune_pages`, along with the directories in
+    `static_root` that this leaves empty. Their published copies are removed
+    when 'static' is published, or right away when `public_root` is given.
+
+    Args:
+        manifest (BuildManifest): The build manifest.
+        pages (iterable): The site's current Page objects.
+        static_root (str, optional): The directory pages render into.
+        public_root (str, optional): The directory it's published to.
+
+    Returns:
+        list: The stale output paths.
+    """
+    stale = manifest.prune_pages(pages)
+    for output in stale:
+        targets = [(output, static_root)]
+        if public_root is not None:
+            targets.append((os.path.join(public_root, os.path.relpath(output, static_root)), public_root))
+        for path, root in targets:
+            if os.path.exists(path):
+                os.remove(path)
+                logger.info(f"\t- Removed '{path}', no page renders to it anymore.")
+            remove_empty_dirs(os.path.dirname(path), root)
+    return stale
+
+
+def remove_empty_dirs(path, root):
+    """
+    Removes `path` and its parents while they are empty, stopping at `root`,
+    which is kept.
+
+    Args:
+        path (str): A directory in `root`.
+        root (str): The directory to stop at.
+    """
+    root = os.path.abspath(root)
+    path = os.path.abspath(path)
+    while path.startswith(root + os.sep):
+        try:
+            os.rmdir(path)
+        except OSError:
+            # Not empty, or already gone
+            return
+        logger.debug(f"\t\t- Removed empty dir '{path}'.")
+        path = os.path.dirname(path)
+
+
+def generate_static_content(
+    manifest=None,
+    jobs=1,
+    cache=None,
+    content_root=CONTENT_DIR,
+    output_root=OUTPUT_DIR,
+    template_path=TEMPLATE_PATH,
+    values=None,
+):
+    """
+    Renders every page in 'content' (see `content.index_content` for the layout) into 'static', creating directories as needed.
+
+    Args:
+        manifest (BuildManifest, optional): When given, pages whose Markdown and dependencies (see `page_dependencies`) are unchanged since the last build are skipped, every page's dependencies are recorded, and the outputs of removed pages are deleted (see `remove_stale_pages`).
+        jobs (int, optional): Number of worker processes to render pages with. 1 renders in this process, 0 uses every CPU core.
+        cache (BodyCache, optional): Reuses the rendered body of any page whose Markdown was rendered before, and is trimmed to its size limit afterwards.
+        content_root (str, optional): The directory of Markdown pages.
+        output_root (str, optional): The directory pages are rendered into, ie. 'static'.
+        template_path (str, optional): The page template.
+        values (dict, optional): Extra template placeholders, see `write_html_document`.
+
+    Returns:
+        list: Paths of the html files that were written.
+
+    Raises:
+        BuildError: If any page failed to render, or two pages render to the same file. Every other page is still written. Also raised, before anything is rendered, if any page fails validation (see `validate.validate_page`).
+    """
+    indexed, problems = index_content(content_root, output_root)
+    if manifest is not None:
+        remove_stale_pages(manifest, indexed, output_root)
+    pages = []
+    for page in indexed:
+        if manifest is not None and not manifest.page_changed(page.source, page.output):
+            logger.debug(f"> Skipping unchanged '{page.source}'.")
+            continue
+        pages.append(page)
+
+    return render_pages(
+        pages,
+        {page.output: page.source for page in indexed},
+        manifest,
+        jobs=jobs,
+        cache=cache,
+        problems=problems,
+        template_path=template_path,
+        static_root=output_root,
+        values=values,
+    )
+
+
+def render_pages(
+    pages,
+    sources,
+    manifest=None,
+    jobs=1,
+    cache=None,
+    problems=(),
+    template_path=TEMPLATE_PATH,
+    static_root=OUTPUT_DIR,
+    values=None,
+):
+    """
+    Validates and renders the given pages, see `generate_static_content`.
+
+    Args:
+        pages (list): The Page objects to render.
+        sources (dict): Output path -> source path of every page on the site, see `page_dependencies`.
+        manifest (BuildManifest, optional): Every rendered page and its dependencies are recorded in it.
+        jobs (int, optional): Number of worker processes to render pages with.
+        cache (BodyCache, optional): Passed to `write_html_document`.
+        problems (list, optional): (source path, message) pairs found while indexing, reported with any other errors.
+        template_path (str, optional): The page template.
+        static_root (str, optional): The directory links and stylesheets resolve to.
+        values (dict, optional): Extra template placeholders, see `write_html_document`.
+
+    Returns:
+        list: Paths of the html files that were written.
+
+    Raises:
+        BuildError: See `generate_static_content`.
+    """
+    if jobs != 1 and len(pages) > 1:
+        jobs = jobs or os.cpu_count() or 1
+    else:
+        jobs = 1
+
+    # Catch every malformed page up front instead of one by one while rendering
+    with profiler.phase("validate"):
+        invalid, warnings = validate_pages([page.source for page in pages], jobs=jobs)
+    for source, warning in warnings:
+        logger.warning(f"> '{source}' {warning}", extra={"page": source})
+    if invalid:
+        for source, error in invalid:
+            logger.error(f"!-- '{source}' {error}", extra={"page": source, "error": error})
+        pages_failed = len({source for source, error in invalid})
+        raise BuildError(
+            list(problems) + invalid,
+            f"{len(invalid)} problem(s) in {pages_failed} page(s), nothing was rendered.",
+        )
+
+    # Make sure every output directory exists
+    for new_dir in sorted({os.path.dirname(page.output) for page in pages}):
+        os.makedirs(new_dir, exist_ok=True)
+
+    profile = profiler.active()
+    render = partial(
+        render_stage,
+        level=logger.getEffectiveLevel(),
+        profile=profile is not None,
+        cache=cache,
+        template_path=template_path,
+        values=values,
+    )
+
+    written = []
+    errors = list(problems)
+    memo_totals = {"hits": 0, "misses": 0}
+    # Sources are read and pages written on I/O threads while pages render;
+    # results arrive in page order no matter which stage finished first
+    for page, result, changed, io_error in run_stages(
+        pages, read_source, render, write_output, jobs=jobs
+    ):
+        if result is not None:
+            replay(result.records)
+            if result.timings:
+                profile.merge(result.timings)
+            for counter, count in result.memo.items():
+                memo_totals[counter] += count
+        if io_error is not None:
+            error = f"{type(io_error).__name__}: {io_error}"
+            logger.error(
+                f"!-- Error reading or writing '{page.source}': {io_error}",
+                extra={"page": page.source, "error": error},
+            )
+            errors.append((page.source, error))
+            continue
+        if result.error is not None:
+            errors.append((page.source, result.error))
+            continue
+        if result.html is not None:
+            # Rendered in memory and written by the write stage
+            log_rendered(page.source, page.output, changed, result.seconds)
+
+        written.append(page.output)
+        if manifest is not None:
+            manifest.record_page(
+                page.source,
+                page.output,
+                page_dependencies(page, result.links, sources, static_root, template_path),
+            )
+
+    lookups = memo_totals["hits"] + memo_totals["misses"]
+    if lookups:
+        logger.info(
+            f"> Inline memo: {memo_totals['hits']} hits, {memo_totals['misses']} misses "
+            f"({100 * memo_totals['hits'] / lookups:.1f}% of {lookups} spans reused).",
+            extra={"inline_hits": memo_totals["hits"], "inline_misses": memo_totals["misses"]},
+        )
+
+    if cache is not None:
+        evicted = cache.evict()
+        if evicted:
+            logger.debug(f"> Evicted {evicted} entries from the body cache.")
+
+    if errors:
+        errors.sort()
+        raise BuildError(errors, written=written)
+    return written
+
+
+# Pages larger than this are rendered straight to disk, a block at a time,
+# instead of being read and rendered in memory
+STREAM_THRESHOLD = 8 << 20
+
+
+class RenderResult:
+    """
+    The outcome of rendering one page, as sent back from a worker process.
+
+    Attributes:
+        html (str): The page, if it was rendered in memory (see `render_text`). None if it was written straight to its file or failed.
+        changed (bool): Whether the page's file changed, if it was written while rendering.
+        error (str): The error message, or None.
+        records (list): The captured log records (see `buildlog.replay`).
+        timings (dict): The page's phase timings, or None.
+        memo (dict): The page's inline memo "hits" and "misses".
+        seconds (float): Time spent rendering.
+        links (list): The URLs the page links to, see `page_dependencies`.
+    """
+
+    __slots__ = ("html", "changed", "error", "records", "timings", "memo", "seconds", "links")
+
+    def __init__(self):
+        self.html = None
+        self.changed = None
+        self.error = None
+        self.records = []
+        self.timings = None
+        self.memo = {"hits": 0, "misses": 0}
+        self.seconds = 0.0
+        self.links = []
+
+
+def read_source(page):
+    """
+    The read stage: loads a page's Markdown, unless it's large enough to be
+    streamed. Runs on an I/O thread, so it's timed here rather than through
+    `profiler.phase` (see `pipeline.run_stages`).
+
+    Returns:
+        tuple (str, float): The Markdown, or None for a page to stream, and the seconds it took to read.
+    """
+    start = time.perf_counter()
+    if os.path.getsize(page.source) > STREAM_THRESHOLD:
+        return None, time.perf_counter() - start
+    with open(page.source, "r") as f:
+        text = f.read()
+    return text, time.perf_counter() - start
+
+
+def render_stage(
+    page,
+    source,
+    level=logging.INFO,
+    profile=False,
+    cache=None,
+    template_path=TEMPLATE_PATH,
+    values=None,
+):
+    """
+    The render stage: renders a page read by `read_source` in memory, or streams
+    a large page straight into its file. Runs in a worker process when building
+    with several jobs.
+
+    Returns:
+        RenderResult: The rendered page, with the read stage's time added to its "read" phase.
+    """
+    text, read_seconds = source
+    if text is None:
+        result = render_indexed_page(
+            page,
+            level=level,
+            profile=profile,
+            cache=cache,
+            template_path=template_path,
+            values=values,
+        )
+    else:
+        result = render_text(
+            page,
+            text,
+            level=level,
+            profile=profile,
+            cache=cache,
+            template_path=template_path,
+            values=values,
+        )
+    _add_timing(result, page, "read", read_seconds)
+    return result
+
+
+def write_output(page, result):
+    """
+    The write stage: writes a page rendered in memory to its file, if it changed.
+    Runs on an I/O thread; the time it takes is added to the page's "write" phase.
+
+    Returns:
+        bool: Whether the file changed, or None if there was nothing to write.
+    """
+    if result.html is None:
+        return result.changed
+    start = time.perf_counter()
+    with OutputFile(page.output) as out:
+        out.write(result.html)
+    _add_timing(result, page, "write", time.perf_counter() - start)
+    return out.changed
+
+
+def _add_timing(result, page, phase, seconds):
+    # Adds time measured outside the page's profile to the phase timings the
+    # main process merges, if the page was profiled
+    if result.timings is not None:
+        phases = result.timings.setdefault(page.source, {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+def render_indexed_page(
+    page, level=logging.INFO, profile=False, cache=None, template_path=TEMPLATE_PATH, values=None
+):
+    """
+    Renders a page found by `content.index_content`, see `render_page`.
+    """
+    return render_page(
+        page.source,
+        page.output,
+        level=level,
+        profile=profile,
+        cache=cache,
+        base=page.base,
+        style=page.style,
+        template_path=template_path,
+        values=values,
+    )
+
+
+def render_page(
+    md_file,
+    html_path,
+    level=logging.INFO,
+    profile=False,
+    cache=None,
+    base=None,
+    style=None,
+    template_path=TEMPLATE_PATH,
+    values=None,
+):
+    """
+    Renders one page straight into its html file, capturing its log records and
+    any error instead of emitting them.
+
+    The page is streamed into a temporary file that only replaces the html file
+    once the page rendered completely, so a failed page leaves the old one intact,
+    and only if it differs from it, so an unchanged page keeps its mtime (see
+    `output.OutputFile`).
+
+    Args:
+        md_file (str): The path to the Markdown file.
+        html_path (str): The path of the html file to write.
+        level (int, optional): The level to log at, since worker processes don't share the main process' logging setup.
+        profile (bool, optional): Time the page's build phases.
+        cache (BodyCache, optional): Passed to `write_html_document`.
+        base (str, optional): Passed to `write_html_document`.
+        style (str, optional): Passed to `write_html_document`.
+        template_path (str, optional): Passed to `write_html_document`.
+        values (dict, optional): Passed to `write_html_document`.
+
+    Returns:
+        RenderResult: The outcome, with `changed` set.
+    """
+
+    def work(result):
+        # File handling, plus anything no finer phase covers, counts as "other"
+        with profiler.phase("other"):
+            # Create new html file or replace the existing file if it changed
+            with OutputFile(html_path) as html_file:
+                write_html_document(
+                    md_file,
+                    html_file,
+                    cache,
+                    base=base,
+                    style=style,
+                    template_path=template_path,
+                    values=values,
                 )
-            html = generate_html_document(target_path)
+            with open(md_file, "r") as f:
+                result.links = find_links(f)
+        result.changed = html_file.changed
+        log_rendered(md_file, html_path, result.changed, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    return _render(md_file, level, profile, work)
+
+
+def render_text(
+    page,
+    text,
+    level=logging.INFO,
+    profile=False,
+    cache=None,
+    template_path=TEMPLATE_PATH,
+    values=None,
+):
+    """
+    Renders a page from its Markdown into a string, capturing its log records and
+    any error instead of emitting them. Nothing is written.
 
-            # Create new html file or overwrite the existing file
-            with open(html_path, "w") as html_file:
-                html_file.write(html)
+    Args:
+        page (Page): The page.
+        text (str): The page's Markdown.
+        level (int, optional): The level to log at.
+        profile (bool, optional): Time the page's build phases.
+        cache (BodyCache, optional): Passed to `write_html_document`.
+        template_path (str, optional): Passed to `write_html_document`.
+        values (dict, optional): Passed to `write_html_document`.
 
+    Returns:
+        RenderResult: The outcome, with `html` set.
+    """
 
-def generate_html_document(md_file):
+    def work(result):
+        out = io.StringIO()
+        write_html_document(
+            page.source,
+            out,
+            cache,
+            base=page.base,
+            style=page.style,
+            text=text,
+            template_path=template_path,
+            values=values,
+        )
+        result.html = out.getvalue()
+        result.links = find_links(text.splitlines())
+
+    return _render(page.source, level, profile, work)
+
+
+def _render(md_file, level, profile, work):
+    result = RenderResult()
+    memo_before = _memoized_inline.cache_info()
+    with capture_records(level) as records, profiler.recording(profile) as page_profile:
+        if page_profile is not None:
+            page_profile.page = md_file
+            result.timings = page_profile.pages
+        start = time.perf_counter()
+        try:
+            work(result)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            logger.error(
+                f"!-- Error converting Markdown to HTML: {e}",
+                extra={"page": md_file, "error": result.error},
+            )
+        result.seconds = time.perf_counter() - start
+    memo_after = _memoized_inline.cache_info()
+    result.records = records
+    result.memo = {
+        "hits": memo_after.hits - memo_before.hits,
+        "misses": memo_after.misses - memo_before.misses,
+    }
+    return result
+
+
+def find_links(lines):
+    """
+    Finds the URLs a page's Markdown links to.
+
+    Args:
+        lines (iterable): The Markdown's lines.
+
+    Returns:
+        list: Every link URL once, in the order they first appear.
+    """
+    urls = {}
+    for line in lines:
+        if "](" in line:
+            for text, url in TextNode._extract_markdown_links(line):
+                urls[url] = None
+    return list(urls)
+
+
+def page_dependencies(
+    page, links, sources, static_root=OUTPUT_DIR, template_path=TEMPLATE_PATH
+):
+    """
+    Lists the files a page's output is rendered from, besides its Markdown: the
+    template, the page's stylesheet and the pages it links to.
+
+    Links to another page depend on that page's Markdown; links to anything else
+    on the site depend on the file in 'static' they resolve to, even if it
+    doesn't exist yet. Links to other sites are ignored.
+
+    Args:
+        page (Page): The page.
+        links (list): The URLs the page links to, see `find_links`.
+        sources (dict): Output path -> source path of every page on the site.
+        static_root (str, optional): The directory the site's files are in.
+        template_path (str, optional): The page template.
+
+    Returns:
+        list: Sorted paths of the page's dependencies.
+    """
+    dependencies = {
+        template_path,
+        os.path.join(static_root, os.path.normpath(page.base + page.style + ".css")),
+    }
+    for url in links:
+        parts = urlsplit(url.strip())
+        if parts.scheme or parts.netloc or not parts.path:
+            continue
+        if parts.path.startswith("/"):
+            path = os.path.normpath(parts.path.lstrip("/") or ".")
+        else:
+            path = os.path.normpath(page.base + parts.path)
+        if path.startswith(".."):
+            continue
+        target = os.path.normpath(os.path.join(static_root, path))
+        # Directories are served as their index.html
+        if not os.path.splitext(target)[1]:
+            target = os.path.join(target, "index.html")
+        dependencies.add(sources.get(target, target))
+    dependencies.discard(page.source)
+    return sorted(dependencies)
+
+
+def log_rendered(md_file, html_path, changed, seconds):
+    if changed:
+        message = f"\t+ Rendered '{md_file}' to '{html_path}'."
+    else:
+        message = f"\t= Rendered '{md_file}', '{html_path}' is unchanged."
+    logger.info(
+        message,
+        extra={
+            "page": md_file,
+            "output": html_path,
+            "changed": changed,
+            "seconds": seconds,
+        },
+    )
+
+
+def generate_html_document(md_file, values=None, template_path=TEMPLATE_PATH):
     """
     Converts a Markdown file to an HTML document string using a template.
 
     Args:
         markdown_file (str): The path to the Markdown file.
+        values (dict, optional): Extra template placeholders, see `write_html_document`.
+        template_path (str, optional): The page template.
 
     Returns:
         html: String containing full HTML text.
-    """
 
-    template_path = "template.html"
-    template = ""
+    Raises:
+        Exception: If the Markdown file can't be read or converted.
+    """
+    out = io.StringIO()
+    write_html_document(md_file, out, values=values, template_path=template_path)
+    return out.getvalue()
+
+
+def write_html_document(
+    md_file,
+    out,
+    cache=None,
+    base=None,
+    style=None,
+    text=None,
+    template_path=TEMPLATE_PATH,
+    values=None,
+):
+    """
+    Converts a Markdown file to an HTML document using a template and streams it
+    into a file-like object, without building the page as one string.
 
-    try:
-        print(f"> Creating HTML doc from '{md_file}' and template: {template_path}")
+    Args:
+        md_file (str): The path to the Markdown file.
+        out: A writable text file-like object.
+        cache (BodyCache, optional): When the page's body is cached it is used without parsing the Markdown; otherwise it is rendered and stored. Pages too large for the cache are streamed as usual.
+        base (str, optional): The page's directory for the template's <base>. Defaults to the Markdown file's directory in 'content'.
+        style (str, optional): The page's stylesheet name. Defaults to the Markdown file's name.
+        text (str, optional): The page's Markdown, if it was already read. Otherwise the file is read.
+        template_path (str, optional): The page template.
+        values (dict, optional): Strings for any other `{{ Name }}` placeholders of the template, eg. {"SiteName": "Tolkien Fan Club"}, inserted as is. Title, Content, Base and Style always come from the page.
+
+    Raises:
+        Exception: If the Markdown file can't be read or converted.
+    """
 
-        with open(template_path, "r") as f:
-            template = f.read()
+    logger.debug(f"> Creating HTML doc from '{md_file}' and template: {template_path}")
 
-        with open(md_file, "r") as f:
-            md_text = f.read()
+    with profiler.phase("template"):
+        template = load_template(template_path)
 
-        lines = md_text.splitlines()
-        page_title = extract_title(lines[0])
-        content_text = "\n".join(lines)
+    if text is None and cache is not None and cache.accepts(os.path.getsize(md_file)):
+        # Small enough to be cached, so small enough to be read at once
+        with profiler.phase("read"), open(md_file, "r") as f:
+            text = f.read()
 
-        html_node = markdown_to_html_node(content_text)
+    # The body is read, converted and written one block at a time while the
+    # template is written, so only the current block is ever held in memory
+    with open(md_file, "r") if text is None else io.StringIO(text) as f:
+        with profiler.phase("read"):
+            first_line = f.readline()
+        page_title = extract_title(first_line)
+        content = StreamedDocument(itertools.chain([first_line], f))
+        if cache is not None and text is not None and cache.accepts(len(text)):
+            content = cached_body(text, content, cache)
 
         head, tail = os.path.split(md_file)
-        stylename = tail[:-3]
+        stylename = tail[:-3] if style is None else style
 
         base_path = ""
-        if head == "content":
+        if base is not None:
+            base_path = base
+        elif head == "content":
             base_path = ""
         else:
             base_path = os.path.relpath(head, "content") + "/"
 
-        content = html_node.to_html()
-        html = fill_template(page_title, content, base_path, stylename, template)
+        with profiler.phase("serialize"):
+            template.write(
+                out,
+                {
+                    **(values or {}),
+                    "Title": escape_text(page_title),
+                    "Content": content,
+                    "Base": base_path,
+                    "Style": stylename,
+                },
+            )
+
+
+def cached_body(text, content, cache):
+    """
+    Returns a page's body from the cache, rendering and storing it on a miss.
+
+    Args:
+        text (str): The page's Markdown.
+        content (HTMLNode): The page's body, only rendered on a miss.
+        cache (BodyCache): The body cache.
+
+    Returns:
+        str: The body HTML.
+    """
+    with profiler.phase("cache"):
+        key = cache.key(text)
+        body = cache.get(key)
+    if body is not None:
+        logger.debug(f"> Reusing cached body {key[:12]}.")
+        return body
+    body = content.to_html()
+    with profiler.phase("cache"):
+        cache.put(key, body)
+    return body
+
+
+class StreamedDocument(HTMLNode):
+    """
+    The HTML of a Markdown document that is produced while its lines are read.
+
+    Serializes to the same `<div>` as `markdown_to_html_node`, but each block is
+    converted and written as soon as the scanner completes it, so memory stays
+    bounded by the largest block rather than the document. The lines can only be
+    consumed once.
 
-        print(f"\t+ Success.")
-        return html
+    Args:
+        lines (iterable): Lines of Markdown, eg. an open file.
+    """
+
+    __slots__ = ("lines", "consumed")
 
-    except Exception as e:
-        print(f"!-- Error converting Markdown to HTML: {e}")
+    def __init__(self, lines):
+        super().__init__(tag="div")
+        self.lines = lines
+        self.consumed = False
 
+    def to_html(self):
+        return "".join(self.iter_html())
 
-def fill_template(title, content, base, style, template: str):
-    filled = template.replace("{{ Title }}", title)
-    filled = filled.replace("{{ Content }}", content)
-    filled = filled.replace("{{ Base }}", base)
-    filled = filled.replace("{{ Style }}", style)
-    return filled
+    def iter_html(self):
+        if self.consumed:
+            raise Exception("A streamed document can only be serialized once.")
+        self.consumed = True
+        blocks = scan_lines(self.lines)
+        yield "<div>"
+        while True:
+            # Scanning includes reading the next lines of the file
+            with profiler.phase("blocks"):
+                block = next(blocks, None)
+            if block is None:
+                break
+            # A block is small enough to be rendered as one string
+            yield block_to_html_node(block.text, block.type).to_html()
+        yield "</div>"
+
+
+def fill_template(title, content, base, style, template: str, values=None):
+    values = {**(values or {}), "Title": title, "Content": content, "Base": base, "Style": style}
+    return Template(template).render(values)
 
 
 def markdown_to_html_node(markdown):
 
-    blocks = markdown_to_blocks(markdown)  # we have the blocks
+    blocks = scan_blocks(markdown)  # we have the blocks, already typed
     html_nodes = []
 
     for block in blocks:  # Process each block into an HTMLNode
-        node = block_to_html_node(block)
+        node = block_to_html_node(block.text, block.type)
         html_nodes.append(node)
 
     # Assemble the Master Node
@@ -223,23 +911,55 @@ def markdown_to_html_node(markdown):
     return doc_node
 
 
-def block_to_html_node(block: str):
+# Inline spans are memoized per process: list items, navigation lines and the
+# like repeat across pages. Long spans (ie. whole paragraphs) rarely repeat and
+# would pin a lot of memory, so they are always rendered.
+INLINE_MEMO_SIZE = 4096
+INLINE_MEMO_MAX_LENGTH = 256
 
-    def text_to_children(text: str):
-        """
-        Creates HTMLNodes from markdown text.
 
-        Args:
-            text (str): The text to process.
+def inline_to_html_nodes(text: str):
+    """
+    Creates HTMLNodes from inline Markdown text.
 
-        Returns:
-            list: A list of LeafNode objects representing the HTML text.
-        """
-        text_nodes = TextNode.from_markdown(text)
-        children = []
-        for node in text_nodes:
-            children.append(HTMLNode.text_node_to_html_node(node))
-        return children
+    Short spans are memoized, so a span that was seen before returns the same
+    LeafNode objects again instead of being parsed; nodes must therefore not be
+    modified after they're created.
+
+    Args:
+        text (str): The text to process.
+
+    Returns:
+        list: A list of LeafNode objects representing the HTML text.
+    """
+    if len(text) > INLINE_MEMO_MAX_LENGTH:
+        return _render_inline(text)
+    return list(_memoized_inline(text))
+
+
+@lru_cache(maxsize=INLINE_MEMO_SIZE)
+def _memoized_inline(text):
+    return tuple(_render_inline(text))
+
+
+def _render_inline(text):
+    return [HTMLNode.text_node_to_html_node(node) for node in TextNode.from_markdown(text)]
+
+
+@timed("nodes")
+def block_to_html_node(block: str, block_type=None):
+    """
+    Converts a Markdown block to an HTMLNode.
+
+    Args:
+        block (str): The Markdown block.
+        block_type (str, optional): The block's type, if the scanner already knows it. Otherwise it is worked out with `block_to_block_type`.
+
+    Returns:
+        ParentNode: The block's HTML.
+    """
+
+    text_to_children = inline_to_html_nodes
 
     def extract_heading(heading_block: str):
         """
@@ -266,7 +986,7 @@ def block_to_html_node(block: str):
                 raise Exception(f"Malformed heading: {heading_block}")
 
     def extract_code(code_block: str):
-        pattern = r"```([a-z]*)\n(.*?)```"  # Capture code language and code
+        pattern = r"```[ \t]*([\w+-]*)[^\n]*\n(.*?)```"  # Capture code language and code
         match = re.match(pattern, code_block, re.DOTALL)
         if match:
             code_language = match.group(1)  # Extract the code language
@@ -317,7 +1037,10 @@ def block_to_html_node(block: str):
             line_nodes.append(ParentNode(tag="li", children=item_parts_nodes))
         return ParentNode(tag="ol", children=line_nodes)
 
-    match block_to_block_type(block):
+    if block_type is None:
+        block_type = block_to_block_type(block)
+
+    match block_type:
         case "heading":
             return extract_heading(block)
         case "code":
@@ -351,24 +1074,10 @@ def markdown_to_blocks(markdown: str):
         >>> markdown_to_blocks(markdown)
         ['This is a block.', 'This is another block.']
     """
-    blocks = []
-    lines = markdown.split("\n")
-
-    block = ""
-    for line in lines:
-        if line.strip("\n") == "":
-            if block == "":
-                continue
-            blocks.append(block.strip())
-            print(f"---DEBUG--- \n\tBlock: {block}")
-            block = ""
-        else:
-            block += line.strip() + "\n"
-    if block:
-        blocks.append(block.rstrip())
-    return blocks
+    return [block.text for block in scan_blocks(markdown)]
 
 
+@timed("block_type")
 def block_to_block_type(block: str):
     """
     Determines the type of a Markdown block.
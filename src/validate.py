@@ -0,0 +1,141 @@
+# validate.py
+
+import itertools
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from blocks import CODE, FENCE, HEADING, ORDERED_LIST, QUOTE, UNORDERED_LIST, scan_lines
+from textnode import TextNode
+
+_HEADING_RE = re.compile(r"#{1,6} ")
+_STAR_RUN_RE = re.compile(r"\*+")
+_CODE_SPAN_RE = re.compile(r"`[^`]*`")
+
+
+def validate_page(source):
+    """
+    Checks a page's Markdown for problems that would make it fail to render, or
+    render differently than intended, without rendering it.
+
+    Errors, which make rendering fail:
+    - the first line isn't a "# " title
+    - a heading isn't one to six "#" followed by a space and text
+    - a code fence is never closed, or closed on the line it opened
+    - a block, or list item, has no text to render: an empty quote, or text
+      that is only delimiters, eg. "**"
+
+    Warnings, which render with the delimiters as literal text:
+    - an odd number of "**", "*" or "`" in a block, or in a list item
+
+    The file is read one line at a time, so this is cheap even for huge pages.
+
+    Args:
+        source (str): The path to the Markdown file.
+
+    Returns:
+        tuple (list, list): Error and warning messages, each starting with the line it's about.
+    """
+    errors = []
+    warnings = []
+    with open(source, "r") as f:
+        first_line = f.readline()
+        if not first_line.startswith("# "):
+            errors.append("line 1: The page must begin with a '# ' title.")
+        for block in scan_lines(itertools.chain([first_line], f)):
+            if block.type == CODE:
+                first, _, rest = block.text.partition("\n")
+                if not rest.rstrip().endswith(FENCE):
+                    if rest or not first.endswith(FENCE) or len(first) < 2 * len(FENCE):
+                        errors.append(f"line {block.start}: Code fence is never closed.")
+                    else:
+                        errors.append(
+                            f"line {block.start}: Code fence must be closed on its own line."
+                        )
+                continue
+            if block.type == HEADING and not _HEADING_RE.match(block.text):
+                errors.append(
+                    f"line {block.start}: Malformed heading, expected 1 to 6 '#' and a space: {block.text.splitlines()[0]!r}"
+                )
+                continue
+            for line, text in _inline_texts(block):
+                if _renders_nothing(text):
+                    errors.append(f"line {line}: Nothing to render, the text is empty or only delimiters: {text!r}")
+                    continue
+                for delimiter in _unbalanced_delimiters(text):
+                    warnings.append(f"line {line}: Unbalanced '{delimiter}' is rendered as text.")
+    return errors, warnings
+
+
+def validate_pages(sources, jobs=1):
+    """
+    Validates many pages, see `validate_page`.
+
+    Args:
+        sources (list): Paths to Markdown files.
+        jobs (int, optional): Number of worker processes. 1 validates in this process.
+
+    Returns:
+        tuple (list, list): Errors and warnings as (source path, message) pairs, in the order of `sources`.
+    """
+    if jobs != 1 and len(sources) > 1:
+        with ProcessPoolExecutor(max_workers=jobs or None) as pool:
+            results = list(pool.map(_validate_safely, sources, chunksize=16))
+    else:
+        results = map(_validate_safely, sources)
+
+    errors = []
+    warnings = []
+    for source, (page_errors, page_warnings) in zip(sources, results):
+        errors.extend((source, error) for error in page_errors)
+        warnings.extend((source, warning) for warning in page_warnings)
+    return errors, warnings
+
+
+def _validate_safely(source):
+    try:
+        return validate_page(source)
+    except Exception as e:
+        return [f"{type(e).__name__}: {e}"], []
+
+
+def _inline_texts(block):
+    # The text the inline parser sees, as (line, text), exactly as
+    # `utils.block_to_html_node` cuts it: list items are parsed one by one,
+    # everything else as one span
+    lines = block.text.split("\n")
+    if block.type == UNORDERED_LIST:
+        return [(block.start + i, line[2:].strip()) for i, line in enumerate(lines)]
+    if block.type == ORDERED_LIST:
+        return [(block.start + i, line.split(".", 1)[1].strip()) for i, line in enumerate(lines)]
+    if block.type == QUOTE:
+        return [(block.start, "\n".join(line[2:] for line in lines))]
+    if block.type == HEADING:
+        return [(block.start, block.text.lstrip("#")[1:])]
+    return [(block.start, block.text)]
+
+
+def _renders_nothing(text):
+    # Only delimiters can vanish while parsing, so only text made of nothing
+    # else is parsed to find out whether any node is left
+    if text.strip("*`"):
+        return False
+    return not TextNode.from_markdown(text)
+
+
+def _unbalanced_delimiters(text):
+    unbalanced = []
+    if "`" in text:
+        if text.count("`") % 2:
+            unbalanced.append("`")
+        else:
+            # Stars in code spans are usually meant literally, eg. `*`
+            text = _CODE_SPAN_RE.sub("", text)
+    if "*" not in text:
+        return unbalanced
+    # Every run of stars is "**" pairs plus at most one "*", so the number of
+    # single stars is odd exactly when the number of stars is
+    if "**" in text and sum(len(run) // 2 for run in _STAR_RUN_RE.findall(text)) % 2:
+        unbalanced.append("**")
+    if text.count("*") % 2:
+        unbalanced.append("*")
+    return unbalanced
@@ -0,0 +1,182 @@
+# watch.py
+#
+# Builds the site, serves 'public' and rebuilds whatever changes while it runs.
+# Usage (from the project root): python3 src/watch.py [--port 8888]
+
+import argparse
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from builder import Site
+from buildlog import configure_logging, logger
+from utils import BuildError
+
+DEBUG_LOG_PATH = "debug_log.txt"
+
+
+def snapshot(paths):
+    """
+    Indexes every file under the given paths. Files and directories that
+    vanish while they are indexed, eg. an editor's temporary files, are left out.
+
+    Args:
+        paths (iterable): Files and directories to index.
+
+    Returns:
+        dict: File path -> (mtime in ns, size).
+    """
+    files = {}
+    stack = list(paths)
+    while stack:
+        path = stack.pop()
+        try:
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            if not os.path.isdir(path):
+                continue
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return files
+
+
+def diff_snapshots(old, new):
+    """
+    Compares two snapshots.
+
+    Returns:
+        tuple (list, list): Sorted paths that are new or changed, and sorted paths that were removed.
+    """
+    changed = sorted(path for path, stat in new.items() if old.get(path) != stat)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+class Watcher:
+    """
+    Polls a site's content, static files and template, and rebuilds only what
+    a change affects, see `Site.build`.
+
+    Attributes:
+        site (Site): The site, with its manifest, cache and content index kept warm between rebuilds.
+        files (dict): The file index from the last poll.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.files = snapshot(self.watched_paths())
+
+    def watched_paths(self):
+        return (self.site.content_root, self.site.static_root, self.site.template_path)
+
+    def poll(self):
+        """
+        Checks the watched paths once and rebuilds anything that changed. Any
+        error is reported and logged, so the next poll runs regardless.
+        """
+        try:
+            files = snapshot(self.watched_paths())
+        except OSError as e:
+            # Nothing is indexed, so the same changes are seen by the next poll
+            print(f"!-- Failed to check for changes: {e}")
+            logger.exception("Failed to check for changes.")
+            return
+        changed, removed = diff_snapshots(self.files, files)
+        self.files = files
+        if changed or removed:
+            self.rebuild(changed, removed)
+
+    def rebuild(self, changed, removed):
+        start = time.perf_counter()
+        try:
+            written = self.site.build(changed + removed)
+        except BuildError as e:
+            print(e.report())
+            written = e.written
+        except Exception as e:
+            # Eg. an OSError while publishing: the site is left as built so far
+            print(f"!-- Rebuild failed: {e!r}")
+            logger.exception("Rebuild failed.", extra={"changes": changed + removed})
+            written = []
+        # Index the rendered pages now so the next poll doesn't see them as changes
+        self.files.update(snapshot(written))
+
+        elapsed = time.perf_counter() - start
+        message = (
+            f"~ {len(changed) + len(removed)} change(s): rendered {len(written)} page(s) "
+            f"in {elapsed * 1000:.1f} ms"
+        )
+        print(message)
+        logger.info(message, extra={"changes": changed + removed, "seconds": elapsed})
+
+
+def serve(port, directory="public"):
+    """
+    Serves a directory on a background thread.
+
+    Args:
+        port (int): The port to serve on.
+        directory (str, optional): The directory to serve.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    handler = partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build, serve 'public' and rebuild on changes.")
+    parser.add_argument("--port", type=int, default=8888, help="port to serve on (default: 8888)")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.1,
+        help="seconds between checks for changes (default: 0.1)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    site = Site()
+
+    print("--- START: watch.py")
+    configure_logging(log_path=DEBUG_LOG_PATH)
+    try:
+        site.build()
+    except BuildError as e:
+        print(e.report())
+
+    watcher = Watcher(site)
+    server = serve(args.port, site.public_root)
+    print(
+        f"--- Serving '{site.public_root}' on http://localhost:{args.port}, "
+        f"watching {', '.join(watcher.watched_paths())}."
+    )
+    try:
+        while True:
+            time.sleep(args.interval)
+            watcher.poll()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print("--- END: watch.py")
@@ -0,0 +1,3 @@
+#! /bin/bash
+
+python3 src/watch.py --port 8888